@@ -1,8 +1,30 @@
+import importlib
 from .state import AgentState, create_initial_state
-from .planner_agent import PlannerAgent, create_planner_agent
-from .research_agent import ResearchAgent, create_research_agent
-from .writer_agent import WriterAgent, create_writer_agent
-from .verifier_agent import VerifierAgent, create_verifier_agent
+
+_LAZY_ATTRIBUTES = {
+    'PlannerAgent': '.planner_agent',
+    'create_planner_agent': '.planner_agent',
+    'ResearchAgent': '.research_agent',
+    'create_research_agent': '.research_agent',
+    'WriterAgent': '.writer_agent',
+    'create_writer_agent': '.writer_agent',
+    'VerifierAgent': '.verifier_agent',
+    'create_verifier_agent': '.verifier_agent',
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
+
 
 __all__ = [
     'AgentState',
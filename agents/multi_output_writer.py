@@ -1,7 +1,10 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from langchain_anthropic import ChatAnthropic
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig
 from .state import AgentState
+from utils.llm_cache import invoke_llm, ainvoke_llm
+from utils.context_packer import pack_notes, get_context_budget
 
 
 MULTI_OUTPUT_PROMPT = """You are a Writer Agent that creates multiple output formats from research notes.
@@ -47,13 +50,87 @@ Remember: Use ONLY information from research notes. Include citations [Source: f
 """
 
 
+SECTION_MARKERS = {
+    "===EXECUTIVE_SUMMARY===": 'executive_summary',
+    "===DETAILED_REPORT===": 'detailed_report',
+    "===ACTION_ITEMS===": 'action_items',
+}
+
+
+class SectionStreamSplitter:
+    
+    def __init__(self):
+        self.buffer = ""
+        self.section = None
+    
+    def feed(self, token: str) -> List[Tuple[str, str]]:
+        self.buffer += token
+        pieces = []
+        
+        while True:
+            found = [(self.buffer.find(marker), marker) for marker in SECTION_MARKERS if marker in self.buffer]
+            if not found:
+                break
+            
+            idx, marker = min(found)
+            if idx > 0 and self.section:
+                pieces.append((self.section, self.buffer[:idx]))
+            self.section = SECTION_MARKERS[marker]
+            self.buffer = self.buffer[idx + len(marker):]
+        
+        keep = self._partial_marker_length()
+        emit = self.buffer[:len(self.buffer) - keep]
+        if emit and self.section:
+            pieces.append((self.section, emit))
+        self.buffer = self.buffer[len(self.buffer) - keep:]
+        
+        return pieces
+    
+    def flush(self) -> List[Tuple[str, str]]:
+        pieces = [(self.section, self.buffer)] if self.buffer and self.section else []
+        self.buffer = ""
+        return pieces
+    
+    def reset(self) -> None:
+        self.buffer = ""
+        self.section = None
+    
+    def _partial_marker_length(self) -> int:
+        longest = max(len(marker) for marker in SECTION_MARKERS) - 1
+        for length in range(min(len(self.buffer), longest), 0, -1):
+            tail = self.buffer[-length:]
+            if any(marker.startswith(tail) for marker in SECTION_MARKERS):
+                return length
+        return 0
+
+
 class MultiOutputWriter:
     
-    def __init__(self, model_name: str = "claude-sonnet-4-20250514", temperature: float = 0.3):
+    def __init__(self, model_name: str = "claude-sonnet-4-20250514", temperature: float = 0.3,
+                 context_budget: Optional[int] = None):
         self.llm = ChatAnthropic(model=model_name, temperature=temperature)
+        self.context_budget = context_budget or get_context_budget('writer')
         self.prompt = ChatPromptTemplate.from_template(MULTI_OUTPUT_PROMPT)
     
-    def write(self, state: AgentState) -> AgentState:
+    def write(self, state: AgentState, config: Optional[RunnableConfig] = None) -> AgentState:
+        if not self._start(state):
+            return state
+        
+        on_token, flush = self._section_stream(config)
+        response = invoke_llm(self.prompt, self.llm, self._prompt_inputs(state), on_token=on_token)
+        flush()
+        return self._apply_outputs(state, response.content)
+    
+    async def awrite(self, state: AgentState, config: Optional[RunnableConfig] = None) -> AgentState:
+        if not self._start(state):
+            return state
+        
+        on_token, flush = self._section_stream(config)
+        response = await ainvoke_llm(self.prompt, self.llm, self._prompt_inputs(state), on_token=on_token)
+        flush()
+        return self._apply_outputs(state, response.content)
+    
+    def _start(self, state: AgentState) -> bool:
         state['agent_trace'].append({
             'agent': 'MultiOutputWriter',
             'action': 'Creating multiple outputs',
@@ -62,17 +139,44 @@ class MultiOutputWriter:
         
         if not state.get('research_notes'):
             state['draft'] = "Cannot create deliverables: No research notes available."
-            return state
-        
-        chain = self.prompt | self.llm
-        response = chain.invoke({
+            return False
+        return True
+    
+    def _prompt_inputs(self, state: AgentState) -> Dict:
+        return {
             "task": state['task'],
             "goal": state['goal'],
-            "research_notes": state['research_notes'],
+            "research_notes": pack_notes(state['research_notes'], self.context_budget),
             "sources": '\n'.join(state.get('citations', []))
-        })
+        }
+    
+    def _section_stream(self, config: Optional[RunnableConfig]):
+        on_token = (config or {}).get('configurable', {}).get('on_token')
+        if not on_token:
+            return None, lambda: None
+        
+        splitter = SectionStreamSplitter()
+        streamed = {}
         
-        full_output = response.content.strip()
+        def stream_sections(token: Optional[str]) -> None:
+            if token is None:
+                splitter.reset()
+                for section in streamed:
+                    on_token(section, None)
+                streamed.clear()
+                return
+            for section, text in splitter.feed(token):
+                streamed[section] = True
+                on_token(section, text)
+        
+        def flush() -> None:
+            for section, text in splitter.flush():
+                on_token(section, text)
+        
+        return stream_sections, flush
+    
+    def _apply_outputs(self, state: AgentState, text: str) -> AgentState:
+        full_output = text.strip()
         
         outputs = self._parse_multi_output(full_output)
         
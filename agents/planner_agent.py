@@ -2,6 +2,7 @@ from typing import Dict
 from langchain_anthropic import ChatAnthropic
 from langchain_core.prompts import ChatPromptTemplate
 from .state import AgentState
+from utils.llm_cache import invoke_llm, ainvoke_llm
 
 
 PLANNER_PROMPT = """You are a Planner Agent in a multi-agent system. Your role is to:
@@ -40,16 +41,23 @@ class PlannerAgent:
         self.prompt = ChatPromptTemplate.from_template(PLANNER_PROMPT)
     
     def plan(self, state: AgentState) -> AgentState:
+        self._start(state)
+        response = invoke_llm(self.prompt, self.llm, {"task": state['task']})
+        return self._apply_plan(state, response.content)
+    
+    async def aplan(self, state: AgentState) -> AgentState:
+        self._start(state)
+        response = await ainvoke_llm(self.prompt, self.llm, {"task": state['task']})
+        return self._apply_plan(state, response.content)
+    
+    def _start(self, state: AgentState) -> None:
         state['agent_trace'].append({
             'agent': 'Planner',
             'action': 'Creating plan',
             'input': state['task']
         })
-        
-        chain = self.prompt | self.llm
-        response = chain.invoke({"task": state['task']})
-        
-        plan_text = response.content
+    
+    def _apply_plan(self, state: AgentState, plan_text: str) -> AgentState:
         lines = plan_text.strip().split('\n')
         goal = ""
         steps = []
@@ -1,8 +1,13 @@
-from typing import Dict, List
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from langchain_anthropic import ChatAnthropic
 from langchain_core.prompts import ChatPromptTemplate
 from .state import AgentState
+from utils.llm_cache import invoke_llm, ainvoke_llm
 from utils.retriever import get_retriever
+from utils.context_packer import pack_documents, get_context_budget
 
 
 RESEARCH_PROMPT = """You are a Research Agent in a multi-agent system. Your role is to:
@@ -34,40 +39,89 @@ INFORMATION GAPS:
 - [Any missing information that would be helpful]
 """
 
+MAX_RESEARCH_STEPS = 4
+DEFAULT_TOP_K = 5
+RERANKED_TOP_K = 3
+
 
 class ResearchAgent:
     
-    def __init__(self, model_name: str = "claude-sonnet-4-20250514", temperature: float = 0.1):
+    def __init__(self, model_name: str = "claude-sonnet-4-20250514", temperature: float = 0.1,
+                 max_steps: int = MAX_RESEARCH_STEPS, top_k: Optional[int] = None,
+                 context_budget: Optional[int] = None):
         self.llm = ChatAnthropic(model=model_name, temperature=temperature)
         self.prompt = ChatPromptTemplate.from_template(RESEARCH_PROMPT)
         self.retriever = get_retriever()
+        self.max_steps = max_steps
+        self.top_k = top_k or (RERANKED_TOP_K if self.retriever.reranker else DEFAULT_TOP_K)
+        self.context_budget = context_budget or get_context_budget('research')
     
     def research(self, state: AgentState) -> AgentState:
+        steps = self._start(state)
+        
+        docs_per_step = self.retriever.search_many([query for _, query in steps], top_k=self.top_k)
+        
+        inputs = [self._prompt_inputs(state, query, docs) for (_, query), docs in zip(steps, docs_per_step)]
+        if len(inputs) == 1:
+            responses = [invoke_llm(self.prompt, self.llm, inputs[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(inputs)) as executor:
+                futures = [
+                    executor.submit(contextvars.copy_context().run, invoke_llm, self.prompt, self.llm, step_inputs)
+                    for step_inputs in inputs
+                ]
+                responses = [future.result() for future in futures]
+        
+        return self._apply_research(state, steps, docs_per_step, [response.content for response in responses])
+    
+    async def aresearch(self, state: AgentState) -> AgentState:
+        steps = self._start(state)
+        
+        docs_per_step = await asyncio.to_thread(self.retriever.search_many, [query for _, query in steps], self.top_k)
+        
+        responses = await asyncio.gather(*(
+            ainvoke_llm(self.prompt, self.llm, self._prompt_inputs(state, query, docs))
+            for (_, query), docs in zip(steps, docs_per_step)
+        ))
+        
+        return self._apply_research(state, steps, docs_per_step, [response.content for response in responses])
+    
+    def _start(self, state: AgentState) -> List[Tuple[int, str]]:
         state['agent_trace'].append({
             'agent': 'Research',
             'action': 'Searching documents',
             'input': state['task']
         })
         
+        steps = self._research_steps(state)
+        if steps:
+            return steps
+        
         search_query = state['task']
         if state['goal']:
             search_query = state['goal']
-        
-        retrieved_docs = self.retriever.search(search_query, top_k=5)
-        state['retrieved_docs'] = retrieved_docs
-        
-        docs_text = self._format_documents(retrieved_docs)
-        
-        chain = self.prompt | self.llm
-        response = chain.invoke({
+        return [(state.get('current_step', 0), search_query)]
+    
+    def _research_steps(self, state: AgentState) -> List[Tuple[int, str]]:
+        steps = []
+        for idx, step in enumerate(state.get('plan', [])):
+            agent, separator, description = step.partition(' - ')
+            if not separator or 'research' not in agent.lower():
+                continue
+            description = description.strip()
+            if description:
+                steps.append((idx, description))
+        return steps[:self.max_steps]
+    
+    def _prompt_inputs(self, state: AgentState, step: str, retrieved_docs: List[Dict]) -> Dict:
+        return {
             "task": state['task'],
             "goal": state['goal'],
-            "current_step": state.get('current_step', 0),
-            "documents": docs_text
-        })
-        
-        research_text = response.content
-        notes = ""
+            "current_step": step,
+            "documents": self._format_documents(retrieved_docs)
+        }
+    
+    def _parse_notes(self, research_text: str) -> Tuple[str, List[str]]:
         sources = []
         
         if "RESEARCH NOTES:" in research_text:
@@ -80,35 +134,60 @@ class ResearchAgent:
         else:
             notes = research_text
         
+        return notes, sources
+    
+    def _apply_research(self, state: AgentState, steps: List[Tuple[int, str]], docs_per_step: List[List[Dict]],
+                        research_texts: List[str]) -> AgentState:
+        retrieved_docs = []
+        seen_chunks = set()
+        for docs in docs_per_step:
+            for doc in docs:
+                key = (doc['source'], doc.get('chunk_id'))
+                if key not in seen_chunks:
+                    seen_chunks.add(key)
+                    retrieved_docs.append(doc)
+        state['retrieved_docs'] = retrieved_docs
+        
+        step_notes = []
+        sources = []
+        seen_sources = set()
+        for (_, step), research_text in zip(steps, research_texts):
+            notes, step_sources = self._parse_notes(research_text)
+            step_notes.append((step, notes))
+            for source in step_sources:
+                if source.lower() not in seen_sources:
+                    seen_sources.add(source.lower())
+                    sources.append(source)
+        
+        if len(step_notes) == 1:
+            notes = step_notes[0][1]
+        else:
+            notes = "\n\n".join(f"### {step}\n{step_text}" for step, step_text in step_notes)
+        
         state['research_notes'] = notes
         state['citations'] = sources
+        state['current_step'] = max(idx for idx, _ in steps) + 1
         
         state['agent_trace'].append({
             'agent': 'Research',
             'action': 'Research completed',
-            'output': f"Found {len(retrieved_docs)} relevant documents, created notes with {len(sources)} sources"
+            'output': f"Researched {len(steps)} steps, found {len(retrieved_docs)} relevant documents, created notes with {len(sources)} sources"
         })
         
         print(f"\n{'='*60}")
         print(f"RESEARCH AGENT")
         print(f"{'='*60}")
+        print(f"Researched {len(steps)} plan step(s):")
+        for _, step in steps:
+            print(f"  - {step}")
         print(f"Retrieved {len(retrieved_docs)} documents")
-        print(f"Sources: {', '.join([d['source'] for d in retrieved_docs])}")
+        print(f"Sources: {', '.join(sorted(set(d['source'] for d in retrieved_docs)))}")
         print(f"{'='*60}\n")
         
         return state
     
     def _format_documents(self, docs: List[Dict]) -> str:
-        if not docs:
-            return "No documents found."
-        
-        formatted = []
-        for idx, doc in enumerate(docs, 1):
-            formatted.append(f"--- Document {idx}: {doc['source']} ---")
-            formatted.append(doc['text'])
-            formatted.append("")
-        
-        return "\n".join(formatted)
+        return pack_documents(docs, self.context_budget)
 
 
 def create_research_agent() -> ResearchAgent:
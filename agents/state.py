@@ -19,6 +19,7 @@ class AgentState(TypedDict):
     completed: bool
     needs_human_input: bool
     multi_outputs: Dict
+    agent_metrics: List[Dict]
 
 
 def create_initial_state(user_task: str) -> AgentState:
@@ -38,5 +39,6 @@ def create_initial_state(user_task: str) -> AgentState:
         messages=[],
         completed=False,
         needs_human_input=False,
-        multi_outputs={}
+        multi_outputs={},
+        agent_metrics=[]
     )
\ No newline at end of file
@@ -1,7 +1,9 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from langchain_anthropic import ChatAnthropic
 from langchain_core.prompts import ChatPromptTemplate
 from .state import AgentState
+from utils.llm_cache import invoke_llm, ainvoke_llm
+from utils.context_packer import pack_notes, get_context_budget
 
 
 VERIFIER_PROMPT = """You are a Verifier Agent in a multi-agent system. Your role is to:
@@ -45,11 +47,27 @@ Be strict: If information isn't in the research notes, it shouldn't be in the dr
 
 class VerifierAgent:
     
-    def __init__(self, model_name: str = "claude-sonnet-4-20250514", temperature: float = 0.0):
+    def __init__(self, model_name: str = "claude-sonnet-4-20250514", temperature: float = 0.0,
+                 context_budget: Optional[int] = None):
         self.llm = ChatAnthropic(model=model_name, temperature=temperature)
+        self.context_budget = context_budget or get_context_budget('verifier')
         self.prompt = ChatPromptTemplate.from_template(VERIFIER_PROMPT)
     
     def verify(self, state: AgentState) -> AgentState:
+        if not self._start(state):
+            return state
+        
+        response = invoke_llm(self.prompt, self.llm, self._prompt_inputs(state))
+        return self._apply_verification(state, response.content)
+    
+    async def averify(self, state: AgentState) -> AgentState:
+        if not self._start(state):
+            return state
+        
+        response = await ainvoke_llm(self.prompt, self.llm, self._prompt_inputs(state))
+        return self._apply_verification(state, response.content)
+    
+    def _start(self, state: AgentState) -> bool:
         state['agent_trace'].append({
             'agent': 'Verifier',
             'action': 'Verifying draft',
@@ -59,21 +77,22 @@ class VerifierAgent:
         if not state.get('draft'):
             state['issues_found'] = ["No draft to verify"]
             state['verification_result'] = {"status": "REJECT", "reason": "Missing draft"}
-            return state
+            return False
         
         if not state.get('research_notes'):
             state['issues_found'] = ["No research notes to verify against"]
             state['verification_result'] = {"status": "REJECT", "reason": "Missing research notes"}
-            return state
-        
-        chain = self.prompt | self.llm
-        response = chain.invoke({
+            return False
+        return True
+    
+    def _prompt_inputs(self, state: AgentState) -> Dict:
+        return {
             "task": state['task'],
-            "research_notes": state['research_notes'],
+            "research_notes": pack_notes(state['research_notes'], self.context_budget),
             "draft": state['draft']
-        })
-        
-        verification_text = response.content
+        }
+    
+    def _apply_verification(self, state: AgentState, verification_text: str) -> AgentState:
         issues = self._parse_issues(verification_text)
         status = self._parse_status(verification_text)
         recommendation = self._parse_recommendation(verification_text)
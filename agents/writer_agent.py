@@ -1,7 +1,10 @@
-from typing import Dict
+from typing import Dict, Optional
 from langchain_anthropic import ChatAnthropic
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig
 from .state import AgentState
+from utils.llm_cache import invoke_llm, ainvoke_llm
+from utils.context_packer import pack_notes, get_context_budget
 
 
 WRITER_PROMPT = """You are a Writer Agent in a multi-agent system. Your role is to:
@@ -34,11 +37,27 @@ Your response should be the complete deliverable, ready to present to the user.
 
 class WriterAgent:
     
-    def __init__(self, model_name: str = "claude-sonnet-4-20250514", temperature: float = 0.3):
+    def __init__(self, model_name: str = "claude-sonnet-4-20250514", temperature: float = 0.3,
+                 context_budget: Optional[int] = None):
         self.llm = ChatAnthropic(model=model_name, temperature=temperature)
+        self.context_budget = context_budget or get_context_budget('writer')
         self.prompt = ChatPromptTemplate.from_template(WRITER_PROMPT)
     
-    def write(self, state: AgentState) -> AgentState:
+    def write(self, state: AgentState, config: Optional[RunnableConfig] = None) -> AgentState:
+        if not self._start(state):
+            return state
+        
+        response = invoke_llm(self.prompt, self.llm, self._prompt_inputs(state), on_token=self._token_callback(config))
+        return self._apply_draft(state, response.content)
+    
+    async def awrite(self, state: AgentState, config: Optional[RunnableConfig] = None) -> AgentState:
+        if not self._start(state):
+            return state
+        
+        response = await ainvoke_llm(self.prompt, self.llm, self._prompt_inputs(state), on_token=self._token_callback(config))
+        return self._apply_draft(state, response.content)
+    
+    def _start(self, state: AgentState) -> bool:
         state['agent_trace'].append({
             'agent': 'Writer',
             'action': 'Creating deliverable',
@@ -52,17 +71,25 @@ class WriterAgent:
                 'action': 'Failed',
                 'output': 'Missing research notes'
             })
-            return state
-        
-        chain = self.prompt | self.llm
-        response = chain.invoke({
+            return False
+        return True
+    
+    def _prompt_inputs(self, state: AgentState) -> Dict:
+        return {
             "task": state['task'],
             "goal": state['goal'],
-            "research_notes": state['research_notes'],
+            "research_notes": pack_notes(state['research_notes'], self.context_budget),
             "sources": '\n'.join(state.get('citations', []))
-        })
-        
-        draft = response.content.strip()
+        }
+    
+    def _token_callback(self, config: Optional[RunnableConfig]):
+        on_token = (config or {}).get('configurable', {}).get('on_token')
+        if not on_token:
+            return None
+        return lambda token: on_token('draft', token)
+    
+    def _apply_draft(self, state: AgentState, text: str) -> AgentState:
+        draft = text.strip()
         state['draft'] = draft
         
         state['agent_trace'].append({
@@ -1,8 +1,9 @@
 import streamlit as st
 import os
+import threading
 from dotenv import load_dotenv
-from graph import run_workflow, run_workflow_multi_output
 from utils.retriever import get_retriever
+from utils.job_queue import get_job_queue, QueueFullError
 
 load_dotenv()
 
@@ -26,6 +27,22 @@ def load_retriever():
     stats = retriever.get_stats()
     return retriever, stats
 
+@st.cache_resource
+def start_warm_up():
+    def run():
+        try:
+            import graph
+            graph.warm_up()
+        except Exception as e:
+            print(f"Warm-up failed: {e}")
+    
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+if os.getenv("STARTUP_WARMUP", "true").lower() in ('1', 'true', 'yes'):
+    start_warm_up()
+
 try:
     retriever, stats = load_retriever()
     st.sidebar.success(f"Documents indexed: {stats['total_documents']}")
@@ -41,6 +58,17 @@ st.sidebar.markdown("---")
 st.sidebar.header("Output Options")
 multi_output_mode = st.sidebar.checkbox("Multi-Output Mode", value=False)
 st.sidebar.caption("Generate Executive Summary + Report + Action Items")
+use_response_cache = st.sidebar.checkbox("Response Cache", value=False)
+st.sidebar.caption("Reuse approved results for identical or near-identical tasks")
+
+job_queue = get_job_queue()
+queue_stats = job_queue.get_stats()
+st.sidebar.markdown("---")
+st.sidebar.header("Job Queue")
+st.sidebar.caption(
+    f"{queue_stats['running']}/{queue_stats['workers']} workers busy · "
+    f"{queue_stats['queue_depth']} waiting · p95 wait {queue_stats['wait_p95_ms'] / 1000:.1f}s"
+)
 
 st.sidebar.markdown("---")
 st.sidebar.header("About")
@@ -75,6 +103,66 @@ examples = [
     }
 ]
 
+SECTION_TITLES = {
+    'draft': "Draft",
+    'executive_summary': "Executive Summary",
+    'detailed_report': "Detailed Report",
+    'action_items': "Action Items"
+}
+
+STREAM_REFRESH_SECONDS = 0.2
+
+def submit_task(task: str) -> None:
+    try:
+        job_id = job_queue.submit(task, multi_output=multi_output_mode, use_cache=use_response_cache)
+    except QueueFullError as e:
+        st.warning(str(e))
+        return
+    st.session_state.active_job = job_id
+    st.rerun()
+
+def render_output(container, output) -> None:
+    for section, text in output.items():
+        container.subheader(SECTION_TITLES.get(section, section))
+        container.markdown(text + "▌")
+
+@st.fragment(run_every=STREAM_REFRESH_SECONDS)
+def show_active_job() -> None:
+    job_id = st.session_state.get('active_job')
+    status = job_queue.status(job_id) if job_id else None
+    if status is None:
+        st.session_state.active_job = None
+        return
+    
+    if status['status'] == 'succeeded':
+        st.session_state.active_job = None
+        st.session_state.last_result = job_queue.result(job_id)
+        st.session_state.last_task = status['task']
+        st.session_state.multi_output_mode = status['multi_output']
+        st.switch_page("pages/2_Results.py")
+    
+    if status['status'] in ('failed', 'timed_out', 'cancelled'):
+        st.session_state.active_job = None
+        st.session_state.job_error = f"Job {job_id} {status['status'].replace('_', ' ')}: {status['error']}"
+        st.rerun()
+    
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        if status['status'] == 'queued':
+            st.info(f"Job {job_id} is queued ({job_queue.get_stats()['queue_depth']} waiting, {status['wait_ms'] / 1000:.0f}s so far)")
+        else:
+            st.info(f"Job {job_id} is running ({status['run_ms'] / 1000:.0f}s)")
+    with col2:
+        if st.button("Cancel", key="cancel_job", use_container_width=True):
+            job_queue.cancel(job_id)
+    render_output(st.container(), status['output'])
+
+if st.session_state.get('job_error'):
+    st.error(st.session_state.pop('job_error'))
+
+if st.session_state.get('active_job'):
+    show_active_job()
+
 tab1, tab2, tab3, tab4 = st.tabs(["Run Task", "Example Tasks", "History", "Dashboard"])
 
 with tab1:
@@ -93,22 +181,7 @@ with tab1:
         clear_button = st.button("Clear", use_container_width=True)
     
     if run_button and user_task:
-        with st.spinner("Running multi-agent workflow..."):
-            try:
-                if multi_output_mode:
-                    final_state = run_workflow_multi_output(user_task)
-                else:
-                    final_state = run_workflow(user_task)
-                
-                st.session_state.last_result = final_state
-                st.session_state.last_task = user_task
-                st.session_state.multi_output_mode = multi_output_mode
-                
-                st.switch_page("pages/2_Results.py")
-                
-            except Exception as e:
-                st.error(f"Error: {e}")
-                st.exception(e)
+        submit_task(user_task)
 
 with tab2:
     st.header("Example Tasks")
@@ -125,21 +198,7 @@ with tab2:
                 st.text(example['task'])
             with col2:
                 if st.button("Run This", key=f"example_{idx}", type="primary", use_container_width=True):
-                    with st.spinner("Running workflow..."):
-                        try:
-                            if multi_output_mode:
-                                final_state = run_workflow_multi_output(example['task'])
-                            else:
-                                final_state = run_workflow(example['task'])
-                            
-                            st.session_state.last_result = final_state
-                            st.session_state.last_task = example['task']
-                            st.session_state.multi_output_mode = multi_output_mode
-                            
-                            st.switch_page("pages/2_Results.py")
-                            
-                        except Exception as e:
-                            st.error(f"Error: {e}")
+                    submit_task(example['task'])
             
             st.markdown("---")
 
@@ -1,9 +1,14 @@
 import os
+import argparse
 from dotenv import load_dotenv
 from graph import run_workflow, print_final_output
 
 load_dotenv()
 
+parser = argparse.ArgumentParser(description="Run the multi-agent demo tasks")
+parser.add_argument("--use-cache", action="store_true", help="Reuse approved results from the response cache")
+args = parser.parse_args()
+
 print("\n" + "="*60)
 print("MULTI-AGENT SYSTEM DEMO")
 print("="*60 + "\n")
@@ -23,7 +28,7 @@ for idx, task in enumerate(demo_tasks, 1):
     print(f"Task: {task}\n")
     
     try:
-        final_state = run_workflow(task)
+        final_state = run_workflow(task, use_cache=args.use_cache)
         print_final_output(final_state)
         
         input("Press Enter to continue to next task...")
@@ -0,0 +1,486 @@
+import sys
+import json
+import shutil
+import subprocess
+import tempfile
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT))
+
+
+COLD_START_SCRIPT = """
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from utils.retriever import DocumentRetriever
+retriever = DocumentRetriever(data_dir={data_dir!r}, persist_directory={persist_directory!r})
+retriever.load_documents()
+print("READY", time.perf_counter() - start)
+"""
+
+
+EMBEDDING_BACKEND_SCRIPT = """
+import sys, time, json, resource
+sys.path.insert(0, {root!r})
+import numpy as np
+start = time.perf_counter()
+from utils.embeddings import create_embedding_backend
+backend = create_embedding_backend({backend!r})
+backend.encode(["warm up"])
+startup = time.perf_counter() - start
+with open({texts_path!r}) as f:
+    texts = json.load(f)
+start = time.perf_counter()
+embeddings = backend.encode(texts, batch_size=64)
+elapsed = time.perf_counter() - start
+np.save({output_path!r}, embeddings)
+print("RESULT", json.dumps({{
+    'startup_s': startup,
+    'texts_per_s': len(texts) / elapsed,
+    'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+}}))
+"""
+
+
+IMPORT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import graph
+print("READY", time.perf_counter() - start)
+"""
+
+
+FIRST_SEARCH_SCRIPT = """
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from utils.retriever import DocumentRetriever
+retriever = DocumentRetriever(data_dir={data_dir!r}, persist_directory={persist_directory!r})
+retriever.load_documents()
+retriever.search("What are the top project risks?")
+print("READY", time.perf_counter() - start)
+"""
+
+
+def _time_subprocess(script: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        cwd=str(ROOT)
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("READY"):
+            return float(line.split()[1])
+    raise RuntimeError(result.stderr or result.stdout)
+
+
+def benchmark_cold_start(runs: int = 3) -> dict:
+    print("Benchmarking retriever cold start (new process, ready to serve)...")
+    
+    data_dir = str(ROOT / "data")
+    persist_dir = tempfile.mkdtemp(prefix="bench_chroma_")
+    
+    try:
+        ephemeral = [
+            _time_subprocess(COLD_START_SCRIPT.format(root=str(ROOT), data_dir=data_dir, persist_directory=None))
+            for _ in range(runs)
+        ]
+        
+        persistent_build = _time_subprocess(
+            COLD_START_SCRIPT.format(root=str(ROOT), data_dir=data_dir, persist_directory=persist_dir)
+        )
+        persistent = [
+            _time_subprocess(COLD_START_SCRIPT.format(root=str(ROOT), data_dir=data_dir, persist_directory=persist_dir))
+            for _ in range(runs)
+        ]
+    finally:
+        shutil.rmtree(persist_dir, ignore_errors=True)
+    
+    results = {
+        'ephemeral_avg_s': sum(ephemeral) / len(ephemeral),
+        'persistent_first_build_s': persistent_build,
+        'persistent_restart_avg_s': sum(persistent) / len(persistent)
+    }
+    
+    print(f"  Ephemeral (re-embed every start): {results['ephemeral_avg_s']:.2f}s")
+    print(f"  Persistent, first build:          {results['persistent_first_build_s']:.2f}s")
+    print(f"  Persistent, restart:              {results['persistent_restart_avg_s']:.2f}s")
+    
+    return results
+
+
+def benchmark_startup(runs: int = 3) -> dict:
+    import time
+    
+    print("Benchmarking process startup (--help, module import, first search)...")
+    
+    help_times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(ROOT / "main.py"), "--help"], capture_output=True, cwd=str(ROOT), check=True)
+        help_times.append(time.perf_counter() - start)
+    
+    import_times = [_time_subprocess(IMPORT_SCRIPT.format(root=str(ROOT))) for _ in range(runs)]
+    
+    persist_dir = tempfile.mkdtemp(prefix="bench_chroma_")
+    try:
+        script = FIRST_SEARCH_SCRIPT.format(root=str(ROOT), data_dir=str(ROOT / "data"), persist_directory=persist_dir)
+        _time_subprocess(script)
+        first_search = [_time_subprocess(script) for _ in range(runs)]
+    finally:
+        shutil.rmtree(persist_dir, ignore_errors=True)
+    
+    results = {
+        'help_avg_s': sum(help_times) / runs,
+        'import_graph_avg_s': sum(import_times) / runs,
+        'first_search_avg_s': sum(first_search) / runs
+    }
+    
+    print(f"  main.py --help (whole process):  {results['help_avg_s']:.2f}s")
+    print(f"  import graph:                    {results['import_graph_avg_s']:.2f}s")
+    print(f"  First search (persisted index): {results['first_search_avg_s']:.2f}s")
+    
+    return results
+
+
+def benchmark_embedding_backends(min_texts: int = 512) -> dict:
+    import numpy as np
+    from utils.chunker import MarkdownChunker
+    from utils.embeddings import EMBEDDING_BACKENDS
+    
+    print("Benchmarking embedding backends (startup, throughput, memory, vector agreement)...")
+    
+    chunker = MarkdownChunker()
+    texts = []
+    for file_path in sorted((ROOT / "data").glob("**/*")):
+        if file_path.is_file() and file_path.suffix in ['.txt', '.md']:
+            texts.extend(chunk['text'] for chunk in chunker.chunk(file_path.read_text(encoding='utf-8'), file_path.name))
+    texts = (texts * (min_texts // max(len(texts), 1) + 1))[:max(min_texts, len(texts))]
+    
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_embeddings_"))
+    texts_path = work_dir / "texts.json"
+    texts_path.write_text(json.dumps(texts))
+    
+    results = {'texts': len(texts)}
+    vectors = {}
+    try:
+        for backend in EMBEDDING_BACKENDS:
+            output_path = work_dir / f"{backend}.npy"
+            script = EMBEDDING_BACKEND_SCRIPT.format(
+                root=str(ROOT), backend=backend, texts_path=str(texts_path), output_path=str(output_path)
+            )
+            result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, cwd=str(ROOT))
+            lines = [line for line in result.stdout.splitlines() if line.startswith("RESULT")]
+            if not lines:
+                print(f"  {backend:<21} unavailable: {(result.stderr or result.stdout).strip().splitlines()[-1:]}")
+                results[backend] = None
+                continue
+            
+            results[backend] = json.loads(lines[-1].split(" ", 1)[1])
+            vectors[backend] = np.load(output_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    baseline = vectors.get('sentence-transformers')
+    for backend, embeddings in vectors.items():
+        if baseline is not None and embeddings.shape == baseline.shape:
+            cosine = (embeddings * baseline).sum(axis=1) / (
+                np.linalg.norm(embeddings, axis=1) * np.linalg.norm(baseline, axis=1)
+            )
+            results[backend]['min_cosine_vs_torch'] = float(cosine.min())
+            results[backend]['mean_cosine_vs_torch'] = float(cosine.mean())
+        
+        stats = results[backend]
+        agreement = f"  cosine vs torch: {stats['mean_cosine_vs_torch']:.4f}" if 'mean_cosine_vs_torch' in stats else ""
+        print(f"  {backend:<21} startup: {stats['startup_s']:.2f}s  "
+              f"throughput: {stats['texts_per_s']:.0f} texts/s  "
+              f"peak RSS: {stats['peak_rss_mb']:.0f}MB{agreement}")
+    
+    return results
+
+
+def benchmark_batched_search(runs: int = 5) -> dict:
+    import time
+    from utils.retriever import get_retriever
+    from test_questions import test_questions, hallucination_tests
+    
+    print("Benchmarking per-query search vs search_many...")
+    
+    retriever = get_retriever()
+    queries = [test['question'] for test in test_questions + hallucination_tests]
+    retriever.search_many(queries[:1])
+    
+    sequential = []
+    batched = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for query in queries:
+            retriever.search(query, top_k=5)
+        sequential.append(time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        retriever.search_many(queries, top_k=5)
+        batched.append(time.perf_counter() - start)
+    
+    results = {
+        'queries': len(queries),
+        'sequential_avg_ms': sum(sequential) / runs * 1000,
+        'batched_avg_ms': sum(batched) / runs * 1000
+    }
+    
+    print(f"  {len(queries)} queries, one search() each: {results['sequential_avg_ms']:.1f}ms")
+    print(f"  {len(queries)} queries, one search_many():  {results['batched_avg_ms']:.1f}ms")
+    
+    return results
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def benchmark_concurrent_search(concurrency: tuple = (1, 8, 32), requests_per_client: int = 20) -> dict:
+    import time
+    import threading
+    from utils.retriever import get_retriever, QueryEmbeddingCache, BATCH_WAIT_MS
+    from utils.batching import MAX_BATCH_SIZE
+    from test_questions import test_questions, hallucination_tests
+    
+    print("Benchmarking concurrent search latency and throughput, unbatched vs micro-batched...")
+    
+    retriever = get_retriever()
+    base_queries = [test['question'] for test in test_questions + hallucination_tests]
+    retriever.search_many(base_queries[:1])
+    original_batcher = retriever.search_batcher
+    original_cache = retriever.query_cache
+    retriever.query_cache = QueryEmbeddingCache()
+    configs = [('unbatched', None), ('batched_0ms', 0.0), (f'batched_{BATCH_WAIT_MS:g}ms', BATCH_WAIT_MS), ('batched_5ms', 5.0)]
+    
+    results = {'requests_per_client': requests_per_client}
+    try:
+        for name, wait_ms in configs:
+            results[name] = {}
+            for clients in concurrency:
+                if wait_ms is None:
+                    retriever.disable_search_batching()
+                else:
+                    retriever.enable_search_batching(MAX_BATCH_SIZE, wait_ms)
+                
+                latencies = []
+                latencies_lock = threading.Lock()
+                barrier = threading.Barrier(clients + 1)
+                
+                def client(client_idx: int) -> None:
+                    own = []
+                    barrier.wait()
+                    for request_idx in range(requests_per_client):
+                        query = f"{base_queries[(client_idx + request_idx) % len(base_queries)]} ({name} {clients}:{client_idx}:{request_idx})"
+                        start = time.perf_counter()
+                        retriever.search(query, top_k=5)
+                        own.append(time.perf_counter() - start)
+                    with latencies_lock:
+                        latencies.extend(own)
+                
+                threads = [threading.Thread(target=client, args=(idx,)) for idx in range(clients)]
+                for thread in threads:
+                    thread.start()
+                barrier.wait()
+                start = time.perf_counter()
+                for thread in threads:
+                    thread.join()
+                elapsed = time.perf_counter() - start
+                
+                stats = {
+                    'p50_ms': _percentile(latencies, 50) * 1000,
+                    'p99_ms': _percentile(latencies, 99) * 1000,
+                    'throughput_qps': len(latencies) / elapsed
+                }
+                if retriever.search_batcher is not None:
+                    stats['avg_batch_size'] = retriever.search_batcher.get_stats()['avg_batch_size']
+                results[name][f'clients_{clients}'] = stats
+                
+                batch_note = f"  avg batch: {stats['avg_batch_size']:.1f}" if 'avg_batch_size' in stats else ""
+                print(f"  {name:<13} {clients:>3} clients  p50: {stats['p50_ms']:7.1f}ms  p99: {stats['p99_ms']:7.1f}ms  "
+                      f"throughput: {stats['throughput_qps']:6.1f} q/s{batch_note}")
+    finally:
+        retriever.query_cache = original_cache
+        if original_batcher is not None:
+            retriever.enable_search_batching(original_batcher.max_batch_size, original_batcher.max_wait * 1000)
+        else:
+            retriever.disable_search_batching()
+    
+    return results
+
+
+def benchmark_hybrid_search(top_k: int = 5, runs: int = 3) -> dict:
+    import time
+    from utils.retriever import get_retriever, SEARCH_MODES
+    from test_questions import test_questions, hallucination_tests
+    
+    print(f"Benchmarking recall@{top_k} and latency per search mode...")
+    
+    retriever = get_retriever()
+    tests = [test for test in test_questions + hallucination_tests if test.get('expected_sources')]
+    original_mode = retriever.search_mode
+    retriever.search_many([test['question'] for test in tests])
+    
+    results = {'queries': len(tests), 'top_k': top_k}
+    try:
+        for mode in SEARCH_MODES:
+            retriever.search_mode = mode
+            
+            recalls = []
+            latencies = []
+            for test in tests:
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    docs = retriever.search(test['question'], top_k=top_k)
+                    latencies.append(time.perf_counter() - start)
+                
+                found = {doc['source'] for doc in docs}
+                expected = test['expected_sources']
+                recalls.append(sum(1 for source in expected if source in found) / len(expected))
+            
+            results[mode] = {
+                f'recall_at_{top_k}': sum(recalls) / len(recalls),
+                'avg_latency_ms': sum(latencies) / len(latencies) * 1000
+            }
+            print(f"  {mode:<7} recall@{top_k}: {results[mode][f'recall_at_{top_k}']:.3f}  "
+                  f"avg latency: {results[mode]['avg_latency_ms']:.1f}ms")
+    finally:
+        retriever.search_mode = original_mode
+    
+    return results
+
+
+def benchmark_rerank(top_k: int = 3) -> dict:
+    import time
+    from utils.retriever import get_retriever
+    from utils.reranker import CrossEncoderReranker
+    from test_questions import test_questions, hallucination_tests
+    
+    print(f"Benchmarking recall@{top_k} with and without cross-encoder reranking...")
+    
+    retriever = get_retriever()
+    tests = [test for test in test_questions + hallucination_tests if test.get('expected_sources')]
+    original_reranker = retriever.reranker
+    
+    results = {'queries': len(tests), 'top_k': top_k}
+    try:
+        for name, reranker in [('no_rerank', None), ('rerank', original_reranker or CrossEncoderReranker())]:
+            retriever.reranker = reranker
+            retriever.search_many([test['question'] for test in tests], top_k=top_k)
+            
+            recalls = []
+            latencies = []
+            prompt_chars = []
+            for test in tests:
+                start = time.perf_counter()
+                docs = retriever.search(test['question'], top_k=top_k)
+                latencies.append(time.perf_counter() - start)
+                prompt_chars.append(sum(len(doc['text']) for doc in docs))
+                
+                found = {doc['source'] for doc in docs}
+                expected = test['expected_sources']
+                recalls.append(sum(1 for source in expected if source in found) / len(expected))
+            
+            results[name] = {
+                f'recall_at_{top_k}': sum(recalls) / len(recalls),
+                'avg_latency_ms': sum(latencies) / len(latencies) * 1000,
+                'avg_context_chars': sum(prompt_chars) / len(prompt_chars)
+            }
+            print(f"  {name:<9} recall@{top_k}: {results[name][f'recall_at_{top_k}']:.3f}  "
+                  f"avg latency (cached scores): {results[name]['avg_latency_ms']:.1f}ms  "
+                  f"avg context: {results[name]['avg_context_chars']:.0f} chars")
+    finally:
+        retriever.reranker = original_reranker
+    
+    return results
+
+
+def benchmark_context_packing(top_k: int = 5) -> dict:
+    from utils.retriever import get_retriever
+    from utils.context_packer import pack_documents, count_tokens, get_context_budget
+    from test_questions import test_questions, hallucination_tests
+    
+    print("Benchmarking research prompt context size, verbatim vs packed...")
+    
+    retriever = get_retriever()
+    queries = [test['question'] for test in test_questions + hallucination_tests]
+    budget = get_context_budget('research')
+    
+    verbatim_tokens = []
+    packed_tokens = []
+    sources_kept = []
+    for docs in retriever.search_many(queries, top_k=top_k):
+        verbatim = "\n".join(f"--- Document {idx}: {doc['source']} ---\n{doc['text']}\n" for idx, doc in enumerate(docs, 1))
+        packed = pack_documents(docs, budget)
+        verbatim_tokens.append(count_tokens(verbatim))
+        packed_tokens.append(count_tokens(packed))
+        sources = {doc['source'] for doc in docs}
+        sources_kept.append(sum(1 for source in sources if f"[Source: {source}]" in packed) / len(sources) if sources else 1.0)
+    
+    results = {
+        'queries': len(queries),
+        'budget_tokens': budget,
+        'verbatim_avg_tokens': sum(verbatim_tokens) / len(verbatim_tokens),
+        'packed_avg_tokens': sum(packed_tokens) / len(packed_tokens),
+        'sources_kept': sum(sources_kept) / len(sources_kept)
+    }
+    
+    print(f"  Verbatim: {results['verbatim_avg_tokens']:.0f} tokens per research prompt")
+    print(f"  Packed:   {results['packed_avg_tokens']:.0f} tokens per research prompt (budget {budget})")
+    print(f"  Sources kept: {results['sources_kept']:.1%}")
+    
+    return results
+
+
+BENCHMARKS = {
+    'cold_start': benchmark_cold_start,
+    'startup': benchmark_startup,
+    'embedding_backends': benchmark_embedding_backends,
+    'batched_search': benchmark_batched_search,
+    'concurrent_search': benchmark_concurrent_search,
+    'hybrid_search': benchmark_hybrid_search,
+    'rerank': benchmark_rerank,
+    'context_packing': benchmark_context_packing,
+}
+
+
+def run_benchmarks(names=None) -> dict:
+    names = names or list(BENCHMARKS.keys())
+    results = {}
+    
+    print("="*60)
+    print("PERFORMANCE BENCHMARKS")
+    print("="*60 + "\n")
+    
+    for name in names:
+        results[name] = BENCHMARKS[name]()
+        print()
+    
+    output_file = f"benchmark_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, 'w') as f:
+        json.dump(results, f, indent=2)
+    
+    print(f"Results saved to: {output_file}")
+    print("="*60)
+    
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run performance benchmarks")
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run (default: all). Available: {', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+    
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(unknown)}")
+    
+    run_benchmarks(args.benchmarks)
\ No newline at end of file
@@ -12,80 +12,171 @@ if not os.getenv("ANTHROPIC_API_KEY"):
     print("Make sure .env file exists in the project root with your API key")
     exit(1)
 
-from graph import run_workflow
+os.environ.setdefault("LLM_CACHE_PATH", str(Path(__file__).parent / "llm_cache.db"))
+
+from graph import arun_workflow
+from utils.llm_cache import get_llm_cache
+from agents.research_agent import MAX_RESEARCH_STEPS
 from test_questions import test_questions, hallucination_tests
 import json
+import time
+import random
+import asyncio
+import argparse
+from collections import deque
 from datetime import datetime
 
-def run_evaluation():
-    results = []
+TOKENS_PER_REQUEST = 3000
+REQUESTS_PER_WORKFLOW = 3 + MAX_RESEARCH_STEPS
+TOKENS_PER_WORKFLOW = TOKENS_PER_REQUEST * REQUESTS_PER_WORKFLOW
+
+
+class RateLimiter:
+    
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._window = deque()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, requests: int = 1, tokens: int = 0) -> None:
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                while self._window and now - self._window[0][0] >= 60:
+                    self._window.popleft()
+                
+                used_requests = sum(r for _, r, _ in self._window)
+                used_tokens = sum(t for _, _, t in self._window)
+                
+                if not self._window or (
+                    used_requests + requests <= self.requests_per_minute and
+                    used_tokens + tokens <= self.tokens_per_minute
+                ):
+                    self._window.append((now, requests, tokens))
+                    return
+                
+                wait = 60 - (now - self._window[0][0])
+            
+            await asyncio.sleep(max(wait, 0.05))
+
+
+def _is_rate_limit_error(e: Exception) -> bool:
+    return getattr(e, 'status_code', None) == 429 or type(e).__name__ == 'RateLimitError'
+
+
+def _retry_delay(e: Exception, attempt: int) -> float:
+    response = getattr(e, 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return min(60, 2 ** attempt) + random.uniform(0, 1)
+
+
+def _build_result(test: dict, final_state: dict) -> dict:
+    output = final_state.get('final_output') or final_state.get('draft', '')
+    citations = final_state.get('citations', [])
+    verification = final_state.get('verification_result', {})
+    
+    passed_verification = verification.get('recommendation') == 'APPROVE'
+    has_citations = len(citations) > 0
+    
+    result = {
+        'test_id': test['id'],
+        'question': test['question'],
+        'category': test['category'],
+        'output_length': len(output),
+        'citations': citations,
+        'has_citations': has_citations,
+        'passed_verification': passed_verification,
+        'verification_status': verification.get('status', 'N/A'),
+        'timestamp': datetime.now().isoformat()
+    }
+    
+    if 'expected_sources' in test:
+        result['expected_sources'] = test['expected_sources']
+        result['found_expected_sources'] = any(
+            exp_src in str(citations) for exp_src in test['expected_sources']
+        )
+    
+    if 'expected_answer' in test:
+        result['expected_answer'] = test['expected_answer']
+        result['answer_found'] = test['expected_answer'].lower() in output.lower()
+    
+    if test['category'] == 'hallucination_check':
+        result['correctly_declined'] = (
+            'not found in sources' in output.lower() or
+            'information not available' in output.lower() or
+            'not mentioned' in output.lower()
+        )
+    
+    return result
+
+
+async def _run_test(idx: int, total: int, test: dict, semaphore: asyncio.Semaphore,
+                    limiter: RateLimiter, max_retries: int) -> dict:
+    async with semaphore:
+        print(f"\n[{idx}/{total}] Testing: {test['question']}")
+        
+        for attempt in range(max_retries + 1):
+            await limiter.acquire(REQUESTS_PER_WORKFLOW, TOKENS_PER_WORKFLOW)
+            
+            try:
+                final_state = await arun_workflow(test['question'])
+                result = _build_result(test, final_state)
+                
+                status = "PASS" if result['passed_verification'] else "FAIL"
+                print(f"   [{idx}/{total}] Status: {status}")
+                print(f"   [{idx}/{total}] Citations: {len(result['citations'])}")
+                print(f"   [{idx}/{total}] Output: {result['output_length']} chars")
+                
+                return result
+            
+            except Exception as e:
+                if _is_rate_limit_error(e) and attempt < max_retries:
+                    delay = _retry_delay(e, attempt)
+                    print(f"   [{idx}/{total}] Rate limited, retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+                    await asyncio.sleep(delay)
+                    continue
+                
+                print(f"   [{idx}/{total}] ERROR: {e}")
+                return {
+                    'test_id': test['id'],
+                    'question': test['question'],
+                    'error': str(e),
+                    'timestamp': datetime.now().isoformat()
+                }
+
+
+async def run_evaluation_async(concurrency: int = 4, requests_per_minute: int = 50,
+                               tokens_per_minute: int = 80000, max_retries: int = 4, llm_cache: str = "off"):
+    os.environ["LLM_CACHE_MODE"] = llm_cache
+    cache = get_llm_cache()
+    cache_hits = cache.hits
+    cache_misses = cache.misses
     
     print("="*60)
     print("EVALUATION FRAMEWORK")
     print("="*60)
     print(f"Running {len(test_questions)} test questions...")
     print(f"Running {len(hallucination_tests)} hallucination tests...")
+    print(f"Concurrency: {concurrency}, budget: {requests_per_minute} req/min, {tokens_per_minute} tokens/min")
+    print(f"LLM cache: {cache.mode}")
     print("="*60 + "\n")
     
     all_tests = test_questions + hallucination_tests
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
     
-    for idx, test in enumerate(all_tests, 1):
-        print(f"\n[{idx}/{len(all_tests)}] Testing: {test['question']}")
-        
-        try:
-            final_state = run_workflow(test['question'])
-            
-            output = final_state.get('final_output') or final_state.get('draft', '')
-            citations = final_state.get('citations', [])
-            verification = final_state.get('verification_result', {})
-            
-            passed_verification = verification.get('recommendation') == 'APPROVE'
-            has_citations = len(citations) > 0
-            
-            result = {
-                'test_id': test['id'],
-                'question': test['question'],
-                'category': test['category'],
-                'output_length': len(output),
-                'citations': citations,
-                'has_citations': has_citations,
-                'passed_verification': passed_verification,
-                'verification_status': verification.get('status', 'N/A'),
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            if 'expected_sources' in test:
-                result['expected_sources'] = test['expected_sources']
-                result['found_expected_sources'] = any(
-                    exp_src in str(citations) for exp_src in test['expected_sources']
-                )
-            
-            if 'expected_answer' in test:
-                result['expected_answer'] = test['expected_answer']
-                result['answer_found'] = test['expected_answer'].lower() in output.lower()
-            
-            if test['category'] == 'hallucination_check':
-                result['correctly_declined'] = (
-                    'not found in sources' in output.lower() or
-                    'information not available' in output.lower() or
-                    'not mentioned' in output.lower()
-                )
-            
-            results.append(result)
-            
-            status = "PASS" if passed_verification else "FAIL"
-            print(f"   Status: {status}")
-            print(f"   Citations: {len(citations)}")
-            print(f"   Output: {len(output)} chars")
-            
-        except Exception as e:
-            print(f"   ERROR: {e}")
-            results.append({
-                'test_id': test['id'],
-                'question': test['question'],
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            })
+    start_time = time.time()
+    results = await asyncio.gather(*(
+        _run_test(idx, len(all_tests), test, semaphore, limiter, max_retries)
+        for idx, test in enumerate(all_tests, 1)
+    ))
+    wall_time = time.time() - start_time
     
     print("\n" + "="*60)
     print("EVALUATION SUMMARY")
@@ -104,14 +195,37 @@ def run_evaluation():
         correctly_declined = sum(1 for r in hallucination_results if r.get('correctly_declined', False))
         print(f"Hallucination tests passed: {correctly_declined}/{len(hallucination_results)}")
     
+    print(f"Wall-clock time: {wall_time:.1f}s")
+    
+    if cache.mode != 'off':
+        hits = cache.hits - cache_hits
+        lookups = hits + cache.misses - cache_misses
+        print(f"LLM cache ({cache.mode}): {hits}/{lookups} calls replayed from {cache.path}")
+        if hits:
+            print("WARNING: cached responses were reused; this is not a fresh run")
+    
     output_file = f"eval_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
     with open(output_file, 'w') as f:
-        json.dump(results, f, indent=2)
+        json.dump(list(results), f, indent=2)
     
     print(f"\nResults saved to: {output_file}")
     print("="*60)
     
-    return results
+    return list(results)
+
+
+def run_evaluation(concurrency: int = 4, requests_per_minute: int = 50,
+                   tokens_per_minute: int = 80000, max_retries: int = 4, llm_cache: str = "off"):
+    return asyncio.run(run_evaluation_async(concurrency, requests_per_minute, tokens_per_minute, max_retries, llm_cache))
 
 if __name__ == "__main__":
-    run_evaluation()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the evaluation suite")
+    parser.add_argument("--concurrency", type=int, default=4, help="Max workflows in flight")
+    parser.add_argument("--rpm", type=int, default=50, help="LLM requests per minute budget")
+    parser.add_argument("--tpm", type=int, default=80000, help="LLM tokens per minute budget")
+    parser.add_argument("--retries", type=int, default=4, help="Retries per test on rate-limit errors")
+    parser.add_argument("--llm-cache", choices=("off", "read", "read_write"), default="off",
+                        help="Reuse cached LLM responses (read) and also store new ones (read_write)")
+    args = parser.parse_args()
+    
+    run_evaluation(args.concurrency, args.rpm, args.tpm, args.retries, args.llm_cache)
\ No newline at end of file
@@ -1,26 +1,46 @@
-from typing import Literal
+import asyncio
+import inspect
+import threading
+import time
+from typing import Literal, Dict, Optional, Callable, Tuple
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
-from agents import (
-    AgentState,
-    create_planner_agent,
-    create_research_agent,
-    create_writer_agent,
-    create_verifier_agent
-)
+from utils.instrumentation import agent_span
+from observability.tracing import get_tracer
+from agents.state import AgentState
 
+AGENT_SETTINGS = ('context_budget', 'max_steps', 'top_k')
 
-def create_workflow() -> StateGraph:
-    planner = create_planner_agent()
-    researcher = create_research_agent()
-    writer = create_writer_agent()
-    verifier = create_verifier_agent()
+
+def _record_span(state: AgentState, span: Dict) -> AgentState:
+    state['agent_metrics'] = list(state.get('agent_metrics') or []) + [span]
+    return state
+
+
+def _timed_node(node: str, agent: str, func, afunc) -> RunnableLambda:
+    takes_config = 'config' in inspect.signature(func).parameters
+    trace_attributes = {'langgraph.node': node, 'agent.name': agent}
     
+    def run(state: AgentState, config) -> AgentState:
+        with get_tracer().start_span(f"node.{node}", trace_attributes), agent_span(agent) as span:
+            result = func(state, config) if takes_config else func(state)
+        return _record_span(result, span)
+    
+    async def arun(state: AgentState, config) -> AgentState:
+        with get_tracer().start_span(f"node.{node}", trace_attributes), agent_span(agent) as span:
+            result = await (afunc(state, config) if takes_config else afunc(state))
+        return _record_span(result, span)
+    
+    return RunnableLambda(run, afunc=arun)
+
+
+def _build_workflow(planner, researcher, writer, verifier) -> StateGraph:
     workflow = StateGraph(AgentState)
     
-    workflow.add_node("planner", planner.plan)
-    workflow.add_node("researcher", researcher.research)
-    workflow.add_node("writer", writer.write)
-    workflow.add_node("verifier", verifier.verify)
+    workflow.add_node("planner", _timed_node("planner", "Planner", planner.plan, planner.aplan))
+    workflow.add_node("researcher", _timed_node("researcher", "Research", researcher.research, researcher.aresearch))
+    workflow.add_node("writer", _timed_node("writer", "Writer", writer.write, writer.awrite))
+    workflow.add_node("verifier", _timed_node("verifier", "Verifier", verifier.verify, verifier.averify))
     
     workflow.set_entry_point("planner")
     workflow.add_edge("planner", "researcher")
@@ -31,28 +51,153 @@ def create_workflow() -> StateGraph:
     return workflow
 
 
+def create_workflow() -> StateGraph:
+    from agents import create_planner_agent, create_research_agent, create_writer_agent, create_verifier_agent
+    
+    return _build_workflow(
+        create_planner_agent(),
+        create_research_agent(),
+        create_writer_agent(),
+        create_verifier_agent()
+    )
+
+
 def create_multi_output_workflow() -> StateGraph:
+    from agents import create_planner_agent, create_research_agent, create_verifier_agent
     from agents.multi_output_writer import create_multi_output_writer
     
-    planner = create_planner_agent()
-    researcher = create_research_agent()
-    writer = create_multi_output_writer()
-    verifier = create_verifier_agent()
+    return _build_workflow(
+        create_planner_agent(),
+        create_research_agent(),
+        create_multi_output_writer(),
+        create_verifier_agent()
+    )
+
+
+class WorkflowRegistry:
     
-    workflow = StateGraph(AgentState)
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._agents: Dict[str, object] = {}
+        self._compiled: Dict[str, object] = {}
+        self._stats = self._empty_stats()
     
-    workflow.add_node("planner", planner.plan)
-    workflow.add_node("researcher", researcher.research)
-    workflow.add_node("writer", writer.write)
-    workflow.add_node("verifier", verifier.verify)
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            'cold_calls': 0,
+            'warm_calls': 0,
+            'cold_time': 0.0,
+            'warm_time': 0.0
+        }
     
-    workflow.set_entry_point("planner")
-    workflow.add_edge("planner", "researcher")
-    workflow.add_edge("researcher", "writer")
-    workflow.add_edge("writer", "verifier")
-    workflow.add_edge("verifier", END)
+    def _get_agent(self, name: str, factory):
+        if name not in self._agents:
+            self._agents[name] = factory()
+        return self._agents[name]
     
-    return workflow
+    def _workflow_agents(self, multi_output: bool) -> Dict[str, object]:
+        from agents import create_planner_agent, create_research_agent, create_writer_agent, create_verifier_agent
+        from agents.multi_output_writer import create_multi_output_writer
+        
+        if multi_output:
+            writer = self._get_agent('multi_output_writer', create_multi_output_writer)
+        else:
+            writer = self._get_agent('writer', create_writer_agent)
+        
+        return {
+            'planner': self._get_agent('planner', create_planner_agent),
+            'researcher': self._get_agent('researcher', create_research_agent),
+            'writer': writer,
+            'verifier': self._get_agent('verifier', create_verifier_agent)
+        }
+    
+    def _compile(self, multi_output: bool):
+        agents = self._workflow_agents(multi_output)
+        return _build_workflow(agents['planner'], agents['researcher'], agents['writer'], agents['verifier']).compile()
+    
+    def agent_settings(self, multi_output: bool = False) -> Dict[str, Dict]:
+        with self._lock:
+            agents = self._workflow_agents(multi_output)
+        
+        settings = {}
+        for role, agent in agents.items():
+            llm = agent.llm
+            settings[role] = {
+                'model': getattr(llm, 'model', None) or getattr(llm, 'model_name', ''),
+                'temperature': getattr(llm, 'temperature', None),
+                **{field: getattr(agent, field) for field in AGENT_SETTINGS if hasattr(agent, field)}
+            }
+        return settings
+    
+    def get_workflow(self, multi_output: bool = False):
+        key = "multi_output" if multi_output else "standard"
+        start_time = time.perf_counter()
+        
+        compiled = self._compiled.get(key)
+        cold = False
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(key)
+                if compiled is None:
+                    compiled = self._compile(multi_output)
+                    self._compiled[key] = compiled
+                    cold = True
+        
+        elapsed = time.perf_counter() - start_time
+        with self._stats_lock:
+            if cold:
+                self._stats['cold_calls'] += 1
+                self._stats['cold_time'] += elapsed
+            else:
+                self._stats['warm_calls'] += 1
+                self._stats['warm_time'] += elapsed
+        
+        return compiled
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._agents.clear()
+            self._compiled.clear()
+            with self._stats_lock:
+                self._stats = self._empty_stats()
+    
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        
+        avg_cold = stats['cold_time'] / stats['cold_calls'] if stats['cold_calls'] else 0.0
+        avg_warm = stats['warm_time'] / stats['warm_calls'] if stats['warm_calls'] else 0.0
+        
+        return {
+            'compiled_workflows': sorted(self._compiled.keys()),
+            'pooled_agents': sorted(self._agents.keys()),
+            'cold_calls': stats['cold_calls'],
+            'warm_calls': stats['warm_calls'],
+            'avg_cold_setup_ms': avg_cold * 1000,
+            'avg_warm_setup_ms': avg_warm * 1000,
+            'time_saved_s': max(0.0, (avg_cold - avg_warm) * stats['warm_calls'])
+        }
+
+
+_registry: Optional[WorkflowRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_registry() -> WorkflowRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = WorkflowRegistry()
+    return _registry
+
+
+def warm_up(multi_output: bool = False) -> None:
+    from utils.retriever import get_retriever
+    
+    get_registry().get_workflow(multi_output)
+    get_retriever().warm_up()
 
 
 def should_continue(state: AgentState) -> Literal["continue", "end"]:
@@ -65,20 +210,52 @@ def should_continue(state: AgentState) -> Literal["continue", "end"]:
     return "end"
 
 
-def run_workflow(user_task: str, multi_output: bool = False) -> AgentState:
-    from agents import create_initial_state
-    import time
-    from utils.logger import get_logger
+def _prompts_fingerprint() -> str:
+    import hashlib
+    from agents.planner_agent import PLANNER_PROMPT
+    from agents.research_agent import RESEARCH_PROMPT
+    from agents.writer_agent import WRITER_PROMPT
+    from agents.verifier_agent import VERIFIER_PROMPT
+    from agents.multi_output_writer import MULTI_OUTPUT_PROMPT
     
-    if multi_output:
-        workflow = create_multi_output_workflow()
-        mode = "MULTI-OUTPUT"
-    else:
-        workflow = create_workflow()
-        mode = "STANDARD"
+    prompts = [PLANNER_PROMPT, RESEARCH_PROMPT, WRITER_PROMPT, VERIFIER_PROMPT, MULTI_OUTPUT_PROMPT]
+    return hashlib.sha256("\n".join(prompts).encode('utf-8')).hexdigest()
+
+
+def _settings_fingerprint(retriever, multi_output: bool) -> str:
+    import json
+    import hashlib
     
-    app = workflow.compile()
-    initial_state = create_initial_state(user_task)
+    settings = {
+        'search_mode': retriever.search_mode,
+        'rerank': retriever.reranker is not None,
+        'agents': get_registry().agent_settings(multi_output)
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _prepare_run(user_task: str, multi_output: bool, use_cache: bool) -> Tuple[str, Optional[Tuple], Optional[AgentState]]:
+    mode = "MULTI-OUTPUT" if multi_output else "STANDARD"
+    cache_entry = None
+    
+    if use_cache:
+        from utils.retriever import get_retriever
+        from utils.response_cache import get_response_cache
+        
+        retriever = get_retriever()
+        cache = get_response_cache()
+        task_embedding = retriever.embed_query(user_task)
+        fingerprint = f"{retriever.corpus_fingerprint()}:{_prompts_fingerprint()}:{_settings_fingerprint(retriever, multi_output)}"
+        cache_entry = (cache, task_embedding, fingerprint)
+        
+        cached_state = cache.lookup(task_embedding, mode, fingerprint, user_task)
+        if cached_state is not None:
+            print(f"\n{'='*60}")
+            print(f"{mode} WORKFLOW SERVED FROM RESPONSE CACHE")
+            print(f"{'='*60}")
+            print(f"Task: {user_task}")
+            print(f"{'='*60}\n")
+            return mode, cache_entry, cached_state
     
     print(f"\n{'='*60}")
     print(f"STARTING {mode} WORKFLOW")
@@ -86,31 +263,103 @@ def run_workflow(user_task: str, multi_output: bool = False) -> AgentState:
     print(f"Task: {user_task}")
     print(f"{'='*60}\n")
     
+    return mode, cache_entry, None
+
+
+def _complete_run(user_task: str, mode: str, cache_entry: Optional[Tuple], final_state: AgentState, duration: float) -> None:
+    from utils.logger import get_logger
+    
+    logger = get_logger()
+    logger.log_workflow(final_state, duration, "success")
+    
+    if cache_entry and final_state.get('verification_result', {}).get('recommendation') == "APPROVE":
+        cache, task_embedding, fingerprint = cache_entry
+        cache.store(task_embedding, mode, fingerprint, user_task, final_state)
+    
+    print(f"\n{'='*60}")
+    print(f"WORKFLOW COMPLETED ({duration:.2f}s)")
+    print(f"{'='*60}\n")
+
+
+def _run_config(on_token: Optional[Callable[[str, str], None]]) -> Optional[Dict]:
+    return {"configurable": {"on_token": on_token}} if on_token else None
+
+
+def _trace_attributes(user_task: str, multi_output: bool, use_cache: bool) -> Dict:
+    return {
+        'workflow.mode': "multi_output" if multi_output else "standard",
+        'workflow.task_length': len(user_task),
+        'workflow.use_cache': use_cache
+    }
+
+
+def run_workflow(user_task: str, multi_output: bool = False, use_cache: bool = False,
+                 on_token: Optional[Callable[[str, str], None]] = None) -> AgentState:
+    with get_tracer().start_span("run_workflow", _trace_attributes(user_task, multi_output, use_cache)) as span:
+        return _run_workflow(user_task, multi_output, use_cache, on_token, span)
+
+
+def _run_workflow(user_task: str, multi_output: bool, use_cache: bool,
+                  on_token: Optional[Callable[[str, str], None]], span) -> AgentState:
+    from agents import create_initial_state
+    
+    mode, cache_entry, cached_state = _prepare_run(user_task, multi_output, use_cache)
+    if span is not None:
+        span.set_attribute('workflow.response_cache_hit', cached_state is not None)
+    if cached_state is not None:
+        return cached_state
+    
+    app = get_registry().get_workflow(multi_output)
+    initial_state = create_initial_state(user_task)
+    
     start_time = time.time()
     
     try:
-        final_state = app.invoke(initial_state)
-        duration = time.time() - start_time
-        status = "success"
-        
-        logger = get_logger()
-        logger.log_workflow(final_state, duration, status)
-        
+        final_state = app.invoke(initial_state, config=_run_config(on_token))
     except Exception as e:
-        duration = time.time() - start_time
-        status = "error"
         print(f"Error: {e}")
         raise
     
-    print(f"\n{'='*60}")
-    print(f"WORKFLOW COMPLETED ({duration:.2f}s)")
-    print(f"{'='*60}\n")
+    _complete_run(user_task, mode, cache_entry, final_state, time.time() - start_time)
+    
+    return final_state
+
+
+async def arun_workflow(user_task: str, multi_output: bool = False, use_cache: bool = False,
+                        on_token: Optional[Callable[[str, str], None]] = None) -> AgentState:
+    with get_tracer().start_span("run_workflow", _trace_attributes(user_task, multi_output, use_cache)) as span:
+        return await _arun_workflow(user_task, multi_output, use_cache, on_token, span)
+
+
+async def _arun_workflow(user_task: str, multi_output: bool, use_cache: bool,
+                         on_token: Optional[Callable[[str, str], None]], span) -> AgentState:
+    from agents import create_initial_state
+    
+    mode, cache_entry, cached_state = await asyncio.to_thread(_prepare_run, user_task, multi_output, use_cache)
+    if span is not None:
+        span.set_attribute('workflow.response_cache_hit', cached_state is not None)
+    if cached_state is not None:
+        return cached_state
+    
+    app = await asyncio.to_thread(get_registry().get_workflow, multi_output)
+    initial_state = create_initial_state(user_task)
+    
+    start_time = time.time()
+    
+    try:
+        final_state = await app.ainvoke(initial_state, config=_run_config(on_token))
+    except Exception as e:
+        print(f"Error: {e}")
+        raise
+    
+    await asyncio.to_thread(_complete_run, user_task, mode, cache_entry, final_state, time.time() - start_time)
     
     return final_state
 
 
-def run_workflow_multi_output(user_task: str) -> AgentState:
-    return run_workflow(user_task, multi_output=True)
+def run_workflow_multi_output(user_task: str, use_cache: bool = False,
+                              on_token: Optional[Callable[[str, str], None]] = None) -> AgentState:
+    return run_workflow(user_task, multi_output=True, use_cache=use_cache, on_token=on_token)
 
 
 def print_agent_trace(state: AgentState) -> None:
@@ -126,6 +375,15 @@ def print_agent_trace(state: AgentState) -> None:
         if 'output' in trace:
             print(f"   Output: {trace['output']}")
     
+    if state.get('agent_metrics'):
+        print(f"\n{'-'*60}")
+        print(f"{'Agent':<12}{'Wall':>10}{'LLM':>10}{'TTFT':>10}{'Retrieval':>11}{'Tokens in/out':>16}")
+        for span in state['agent_metrics']:
+            retrieval_ms = span.get('embedding_ms', 0) + span.get('search_ms', 0)
+            ttft = f"{span['ttft_ms']:.0f}ms" if span.get('ttft_ms') is not None else "-"
+            tokens = f"{span.get('input_tokens', 0)}/{span.get('output_tokens', 0)}"
+            print(f"{span['agent']:<12}{span['wall_ms']:>8.0f}ms{span['llm_ms']:>8.0f}ms{ttft:>10}{retrieval_ms:>9.0f}ms{tokens:>16}")
+    
     print(f"\n{'='*60}\n")
 
 
@@ -1,38 +1,85 @@
 import os
-from dotenv import load_dotenv
-from graph import run_workflow, print_agent_trace, print_final_output
+import argparse
+import threading
+from typing import Optional
 
-load_dotenv()
+EXAMPLE_TASKS = [
+    "Summarize the top 5 risks mentioned across these project docs and propose mitigations",
+    "Create a client update email from the latest weekly report doc",
+    "Compare two approaches described in docs and recommend one with justification",
+    "Extract all deadlines + owners from docs and format them into an action list",
+]
 
-if not os.getenv("ANTHROPIC_API_KEY"):
-    print("Error: ANTHROPIC_API_KEY not found in environment")
-    print("Please create a .env file with your API key")
-    print("See .env.example for template")
-    exit(1)
 
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Agentic Research & Action Assistant")
+    parser.add_argument("task", nargs="?", help="Task to run, or an example number (1-4). Prompts interactively if omitted")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="Don't load models and the document index in the background while waiting for input")
+    return parser.parse_args(argv)
 
-def main():
-    print("\n" + "="*60)
-    print("AGENTIC RESEARCH & ACTION ASSISTANT")
-    print("="*60 + "\n")
+
+def start_warm_up() -> threading.Thread:
+    def run():
+        try:
+            import graph
+            graph.warm_up()
+        except Exception as e:
+            print(f"\nWarm-up failed: {e}")
+    
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def make_token_printer():
+    current = {'section': None}
     
-    example_tasks = [
-        "Summarize the top 5 risks mentioned across these project docs and propose mitigations",
-        "Create a client update email from the latest weekly report doc",
-        "Compare two approaches described in docs and recommend one with justification",
-        "Extract all deadlines + owners from docs and format them into an action list",
-    ]
+    def print_token(section: str, token: Optional[str]) -> None:
+        if token is None:
+            current['section'] = None
+            print(f"\n[{section.replace('_', ' ')} stream interrupted; discard the partial output above]\n")
+            return
+        if section != current['section']:
+            current['section'] = section
+            print(f"\n--- {section.replace('_', ' ').upper()} (streaming) ---\n")
+        print(token, end='', flush=True)
     
-    print("Example tasks:")
-    for idx, task in enumerate(example_tasks, 1):
-        print(f"{idx}. {task}")
+    return print_token
+
+
+def main(argv=None):
+    args = parse_args(argv)
     
-    print("\n" + "-"*60 + "\n")
+    from dotenv import load_dotenv
+    load_dotenv()
     
-    choice = input("Enter task number (1-4) or type your own task: ").strip()
+    if not os.getenv("ANTHROPIC_API_KEY"):
+        print("Error: ANTHROPIC_API_KEY not found in environment")
+        print("Please create a .env file with your API key")
+        print("See .env.example for template")
+        exit(1)
     
-    if choice.isdigit() and 1 <= int(choice) <= len(example_tasks):
-        user_task = example_tasks[int(choice) - 1]
+    print("\n" + "="*60)
+    print("AGENTIC RESEARCH & ACTION ASSISTANT")
+    print("="*60 + "\n")
+    
+    if args.task is None:
+        if not args.no_warmup and os.getenv("STARTUP_WARMUP", "true").lower() in ('1', 'true', 'yes'):
+            start_warm_up()
+        
+        print("Example tasks:")
+        for idx, task in enumerate(EXAMPLE_TASKS, 1):
+            print(f"{idx}. {task}")
+        
+        print("\n" + "-"*60 + "\n")
+        
+        choice = input("Enter task number (1-4) or type your own task: ").strip()
+    else:
+        choice = args.task.strip()
+    
+    if choice.isdigit() and 1 <= int(choice) <= len(EXAMPLE_TASKS):
+        user_task = EXAMPLE_TASKS[int(choice) - 1]
     else:
         user_task = choice
     
@@ -41,7 +88,9 @@ def main():
         return
     
     try:
-        final_state = run_workflow(user_task)
+        from graph import run_workflow, print_agent_trace, print_final_output
+        
+        final_state = run_workflow(user_task, on_token=make_token_printer())
         
         print_agent_trace(final_state)
         print_final_output(final_state)
@@ -7,27 +7,23 @@ import json
 from pathlib import Path
 import sys
 sys.path.append('..')
+from utils.logger import open_log_store
 
 st.set_page_config(page_title="Observability Dashboard", layout="wide")
 
 st.title("Multi-Agent System Observability Dashboard")
 
-def load_logs():
-    log_files = list(Path('../logs').glob('*.json')) if Path('../logs').exists() else []
-    if not log_files:
-        log_files = list(Path('logs').glob('*.json')) if Path('logs').exists() else []
-    
-    if not log_files:
-        return []
-    
-    all_logs = []
-    for log_file in log_files:
-        try:
-            with open(log_file, 'r') as f:
-                all_logs.append(json.load(f))
-        except:
-            continue
-    return all_logs
+TIME_WINDOWS = {
+    "Last hour": 3600,
+    "Last 24 hours": 24 * 3600,
+    "Last 7 days": 7 * 24 * 3600,
+    "All time": None
+}
+
+@st.cache_resource
+def get_log_store():
+    log_path = Path('../logs') if Path('../logs').exists() else Path('logs')
+    return open_log_store(log_path)
 
 def load_eval_results():
     eval_paths = [Path('../eval'), Path('eval')]
@@ -41,6 +37,14 @@ def load_eval_results():
                     return json.load(f)
     return []
 
+window = st.selectbox("Time window", list(TIME_WINDOWS.keys()), index=1)
+window_seconds = TIME_WINDOWS[window]
+since = datetime.now().timestamp() - window_seconds if window_seconds else None
+
+log_store = get_log_store()
+summary = log_store.summary(since)
+total_requests = summary['requests']
+
 st.markdown("---")
 
 tabs = st.tabs(["Real-time Metrics", "Agent Performance", "Quality Metrics", "System Health"])
@@ -50,44 +54,44 @@ with tabs[0]:
     
     col1, col2, col3, col4 = st.columns(4)
     
-    logs = load_logs()
-    
     with col1:
-        st.metric("Total Requests", len(logs))
+        st.metric("Total Requests", total_requests)
     
     with col2:
-        if logs:
-            avg_time = sum(log.get('duration', 0) for log in logs) / len(logs)
+        if total_requests:
+            avg_time = summary['duration_sum'] / total_requests
             st.metric("Avg Response Time", f"{avg_time:.2f}s")
         else:
             st.metric("Avg Response Time", "N/A")
     
     with col3:
-        if logs:
-            success_rate = sum(1 for log in logs if log.get('status') == 'success') / len(logs) * 100
+        if total_requests:
+            success_rate = summary['successes'] / total_requests * 100
             st.metric("Success Rate", f"{success_rate:.1f}%")
         else:
             st.metric("Success Rate", "N/A")
     
     with col4:
-        if logs:
-            with_citations = sum(1 for log in logs if log.get('citations_count', 0) > 0) / len(logs) * 100
+        if total_requests:
+            with_citations = summary['with_citations'] / total_requests * 100
             st.metric("Citation Rate", f"{with_citations:.1f}%")
         else:
             st.metric("Citation Rate", "N/A")
     
-    if logs:
+    if total_requests:
+        timeline = log_store.timeline(since)
+        
         st.subheader("Request Timeline")
         df = pd.DataFrame([{
-            'timestamp': log.get('timestamp', ''),
-            'duration': log.get('duration', 0),
-            'status': log.get('status', 'unknown')
-        } for log in logs])
+            'timestamp': datetime.fromtimestamp(row['bucket']),
+            'duration': row['duration_sum'] / row['requests'],
+            'requests': row['requests']
+        } for row in timeline if row['requests']])
         
         if not df.empty:
-            fig = px.line(df, x='timestamp', y='duration', 
-                         title='Response Time Over Time',
-                         labels={'duration': 'Duration (seconds)', 'timestamp': 'Time'})
+            fig = px.line(df, x='timestamp', y='duration', hover_data=['requests'],
+                         title=f"Average Response Time per {log_store.granularity_for(since).capitalize()}",
+                         labels={'duration': 'Avg Duration (seconds)', 'timestamp': 'Time'})
             st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No workflow data available yet. Run some tasks first!")
@@ -95,21 +99,15 @@ with tabs[0]:
 with tabs[1]:
     st.header("Agent Performance")
     
-    if logs:
-        agent_data = {}
-        for log in logs:
-            for trace in log.get('agent_trace', []):
-                agent = trace['agent']
-                if agent not in agent_data:
-                    agent_data[agent] = {'calls': 0, 'actions': []}
-                agent_data[agent]['calls'] += 1
-                agent_data[agent]['actions'].append(trace.get('action', 'unknown'))
+    agent_calls = log_store.agent_calls(since)
+    
+    if agent_calls:
+        agent_actions = log_store.agent_actions(since)
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Agent Call Distribution")
-            agent_calls = {agent: data['calls'] for agent, data in agent_data.items()}
             fig = px.pie(values=list(agent_calls.values()), 
                         names=list(agent_calls.keys()),
                         title='Agent Invocation Distribution')
@@ -117,18 +115,32 @@ with tabs[1]:
         
         with col2:
             st.subheader("Agent Call Counts")
-            for agent, data in agent_data.items():
-                st.metric(f"{agent} Agent", f"{data['calls']} calls")
+            for agent, calls in agent_calls.items():
+                st.metric(f"{agent} Agent", f"{calls} calls")
         
         st.subheader("Agent Action Breakdown")
-        for agent, data in agent_data.items():
+        for agent, action_counts in agent_actions.items():
             with st.expander(f"{agent} Agent Actions"):
-                action_counts = {}
-                for action in data['actions']:
-                    action_counts[action] = action_counts.get(action, 0) + 1
-                
                 for action, count in action_counts.items():
                     st.write(f"- {action}: {count}x")
+        
+        agent_latency = log_store.agent_latency(since)
+        if agent_latency:
+            st.markdown("---")
+            st.subheader("Latency Breakdown")
+            
+            latency_df = pd.DataFrame(agent_latency)
+            latency_df['retrieval_ms'] = latency_df['embedding_ms'] + latency_df['search_ms']
+            latency_df['other_ms'] = (latency_df['wall_ms'] - latency_df['llm_ms'] - latency_df['retrieval_ms']).clip(lower=0)
+            
+            fig = px.bar(latency_df, x='agent', y=['llm_ms', 'retrieval_ms', 'other_ms'],
+                        title='Average Time per Agent Call (ms)',
+                        labels={'value': 'ms', 'variable': 'Component'})
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.dataframe(latency_df[['agent', 'spans', 'wall_ms', 'llm_ms', 'ttft_ms', 'embedding_ms',
+                                     'search_ms', 'llm_calls', 'input_tokens', 'output_tokens']].round(1),
+                         use_container_width=True)
     else:
         st.info("No agent performance data available yet. Run some tasks first!")
 
@@ -0,0 +1,391 @@
+import os
+import json
+import time
+import queue
+import atexit
+import secrets
+import threading
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator
+
+
+SERVICE_NAME = "multi-agent-research-assistant"
+TRACE_FILE = "logs/traces.jsonl"
+OTLP_ENDPOINT = "http://localhost:4318/v1/traces"
+MAX_QUEUE_SIZE = 2048
+MAX_BATCH_SIZE = 512
+SCHEDULE_DELAY = 1.0
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: ContextVar[Optional['Span']] = ContextVar('trace_span', default=None)
+_captured_spans: ContextVar[Optional[List['Span']]] = ContextVar('captured_spans', default=None)
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{'key': key, 'value': _attribute_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class Span:
+    
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.attributes = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns = None
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+    
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+    
+    def record_exception(self, error: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = str(error)
+        self.events.append({
+            'name': 'exception',
+            'timeUnixNano': str(time.time_ns()),
+            'attributes': _attributes({
+                'exception.type': type(error).__name__,
+                'exception.message': str(error)
+            })
+        })
+    
+    def end(self) -> None:
+        if self.end_time_ns is None:
+            self.end_time_ns = time.time_ns()
+            if self.status_code == STATUS_UNSET:
+                self.status_code = STATUS_OK
+    
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_time_ns or time.time_ns()
+        return (end - self.start_time_ns) / 1e6
+    
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,
+            'startTimeUnixNano': str(self.start_time_ns),
+            'endTimeUnixNano': str(self.end_time_ns or time.time_ns()),
+            'attributes': _attributes(self.attributes),
+            'status': {'code': self.status_code, 'message': self.status_message}
+        }
+        if self.parent_span_id:
+            span['parentSpanId'] = self.parent_span_id
+        if self.events:
+            span['events'] = self.events
+        return span
+
+
+class SpanExporter:
+    
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+    
+    def shutdown(self) -> None:
+        pass
+
+
+def otlp_payload(spans: List[Span], service_name: str = SERVICE_NAME) -> Dict[str, Any]:
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _attributes({'service.name': service_name})},
+            'scopeSpans': [{
+                'scope': {'name': 'multi-agent-research-assistant.tracing'},
+                'spans': [span.to_otlp() for span in spans]
+            }]
+        }]
+    }
+
+
+class OTLPFileExporter(SpanExporter):
+    
+    def __init__(self, path: str = TRACE_FILE, service_name: str = SERVICE_NAME):
+        self.path = Path(path)
+        self.service_name = service_name
+    
+    def export(self, spans: List[Span]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(otlp_payload(spans, self.service_name)) + "\n")
+
+
+class OTLPHttpExporter(SpanExporter):
+    
+    def __init__(self, endpoint: str = OTLP_ENDPOINT, service_name: str = SERVICE_NAME, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+    
+    def export(self, spans: List[Span]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(otlp_payload(spans, self.service_name)).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class InMemorySpanExporter(SpanExporter):
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans: List[Span] = []
+    
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self._spans.extend(spans)
+    
+    def get_finished_spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._spans = []
+
+
+class BatchSpanProcessor:
+    
+    def __init__(self, exporter: SpanExporter, max_queue_size: int = MAX_QUEUE_SIZE,
+                 max_batch_size: int = MAX_BATCH_SIZE, schedule_delay: float = SCHEDULE_DELAY):
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.schedule_delay = schedule_delay
+        self.dropped = 0
+        self.exported = 0
+        self.failed = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._flush_requests: queue.Queue = queue.Queue()
+        self._shutdown = threading.Event()
+        self._wake = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._worker.start()
+    
+    def on_end(self, span: Span) -> None:
+        if self._shutdown.is_set():
+            return
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._queue.qsize() >= self.max_batch_size:
+            self._wake.set()
+    
+    def _drain(self) -> List[Span]:
+        batch = []
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _export(self, batch: List[Span]) -> None:
+        try:
+            self.exporter.export(batch)
+            self.exported += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"Trace export failed ({len(batch)} spans dropped): {e}")
+    
+    def _export_pending(self) -> None:
+        batch = self._drain()
+        while batch:
+            self._export(batch)
+            batch = self._drain()
+        
+        while not self._flush_requests.empty():
+            self._flush_requests.get_nowait().set()
+    
+    def _run(self) -> None:
+        while not self._shutdown.is_set():
+            self._wake.wait(self.schedule_delay)
+            self._wake.clear()
+            self._export_pending()
+        self._export_pending()
+    
+    def force_flush(self, timeout: float = 10.0) -> bool:
+        if not self._worker.is_alive():
+            return False
+        done = threading.Event()
+        self._flush_requests.put(done)
+        self._wake.set()
+        return done.wait(timeout)
+    
+    def shutdown(self, timeout: float = 10.0) -> None:
+        if self._shutdown.is_set():
+            return
+        self._shutdown.set()
+        self._wake.set()
+        self._worker.join(timeout)
+        self.exporter.shutdown()
+    
+    def get_stats(self) -> Dict:
+        return {
+            'queued': self._queue.qsize(),
+            'exported': self.exported,
+            'dropped': self.dropped,
+            'failed': self.failed
+        }
+
+
+class Tracer:
+    
+    def __init__(self, processor: Optional[BatchSpanProcessor] = None):
+        self.processor = processor
+    
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+    
+    @contextmanager
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Optional[Span]]:
+        if self.processor is None:
+            yield None
+            return
+        
+        parent = _current_span.get()
+        span = Span(
+            name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            parent_span_id=parent.span_id if parent else None,
+            attributes=attributes
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            self._finish(span)
+    
+    def _finish(self, span: Span) -> None:
+        captured = _captured_spans.get()
+        if captured is not None:
+            captured.append(span)
+        else:
+            self.processor.on_end(span)
+    
+    def replay_spans(self, spans: List[Span]) -> None:
+        if self.processor is None or not spans:
+            return
+        
+        parent = _current_span.get()
+        trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        span_ids = {span.span_id: secrets.token_hex(8) for span in spans}
+        for span in spans:
+            copy = Span(
+                span.name,
+                trace_id=trace_id,
+                parent_span_id=span_ids.get(span.parent_span_id, parent.span_id if parent else None),
+                attributes=span.attributes
+            )
+            copy.span_id = span_ids[span.span_id]
+            copy.events = list(span.events)
+            copy.status_code = span.status_code
+            copy.status_message = span.status_message
+            copy.start_time_ns = span.start_time_ns
+            copy.end_time_ns = span.end_time_ns
+            self._finish(copy)
+    
+    def force_flush(self, timeout: float = 10.0) -> bool:
+        return self.processor.force_flush(timeout) if self.processor else True
+    
+    def shutdown(self) -> None:
+        if self.processor:
+            self.processor.shutdown()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def capture_spans() -> Iterator[List[Span]]:
+    spans: List[Span] = []
+    parent_token = _current_span.set(None)
+    capture_token = _captured_spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _captured_spans.reset(capture_token)
+        _current_span.reset(parent_token)
+
+
+def create_exporter(name: str) -> Optional[SpanExporter]:
+    service_name = os.getenv("OTEL_SERVICE_NAME", SERVICE_NAME)
+    if name == 'off':
+        return None
+    if name == 'file':
+        return OTLPFileExporter(os.getenv("TRACING_FILE", TRACE_FILE), service_name)
+    if name == 'otlp':
+        return OTLPHttpExporter(os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT", OTLP_ENDPOINT), service_name)
+    if name == 'memory':
+        return InMemorySpanExporter()
+    raise ValueError(f"Unknown tracing exporter '{name}'. Expected one of: off, file, otlp, memory")
+
+
+def create_tracer(exporter: Optional[SpanExporter]) -> Tracer:
+    if exporter is None:
+        return Tracer()
+    
+    tracer = Tracer(BatchSpanProcessor(
+        exporter,
+        schedule_delay=float(os.getenv("TRACING_SCHEDULE_DELAY", SCHEDULE_DELAY))
+    ))
+    atexit.register(tracer.shutdown)
+    return tracer
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = create_tracer(create_exporter(os.getenv("TRACING_EXPORTER", "off")))
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> Tracer:
+    global _tracer
+    with _tracer_lock:
+        previous, _tracer = _tracer, tracer
+    if previous is not None and previous is not tracer:
+        previous.shutdown()
+    return tracer
\ No newline at end of file
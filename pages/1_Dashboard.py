@@ -6,27 +6,27 @@ import json
 from pathlib import Path
 import sys
 sys.path.append('..')
+from utils.logger import open_log_store
 
 st.set_page_config(page_title="Dashboard", layout="wide")
 
 st.title("Observability Dashboard")
 st.markdown("Real-time monitoring and analytics for your multi-agent system")
 
-def load_logs():
-    log_paths = [Path('../logs'), Path('logs')]
-    for log_path in log_paths:
-        if log_path.exists():
-            log_files = list(log_path.glob('*.json'))
-            if log_files:
-                all_logs = []
-                for log_file in log_files:
-                    try:
-                        with open(log_file, 'r') as f:
-                            all_logs.append(json.load(f))
-                    except:
-                        continue
-                return all_logs
-    return []
+TIME_WINDOWS = {
+    "Last hour": 3600,
+    "Last 24 hours": 24 * 3600,
+    "Last 7 days": 7 * 24 * 3600,
+    "All time": None
+}
+
+@st.cache_resource
+def get_log_store():
+    log_path = Path('../logs') if Path('../logs').exists() else Path('logs')
+    return open_log_store(log_path)
+
+def load_logs(since=None):
+    return get_log_store().query_workflows(since=since)
 
 def load_eval_results():
     eval_paths = [Path('../eval'), Path('eval')]
@@ -39,6 +39,14 @@ def load_eval_results():
                     return json.load(f)
     return []
 
+window = st.selectbox("Time window", list(TIME_WINDOWS.keys()), index=1)
+window_seconds = TIME_WINDOWS[window]
+since = datetime.now().timestamp() - window_seconds if window_seconds else None
+
+log_store = get_log_store()
+summary = log_store.summary(since)
+total_requests = summary['requests']
+
 st.markdown("---")
 
 tabs = st.tabs(["Metrics", "Agents", "Quality", "System"])
@@ -46,48 +54,48 @@ tabs = st.tabs(["Metrics", "Agents", "Quality", "System"])
 with tabs[0]:
     st.header("Real-time Metrics")
     
-    logs = load_logs()
-    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Requests", len(logs))
+        st.metric("Total Requests", total_requests)
     
     with col2:
-        if logs:
-            avg_time = sum(log.get('duration', 0) for log in logs) / len(logs)
+        if total_requests:
+            avg_time = summary['duration_sum'] / total_requests
             st.metric("Avg Response Time", f"{avg_time:.2f}s")
         else:
             st.metric("Avg Response Time", "N/A")
     
     with col3:
-        if logs:
-            success_rate = sum(1 for log in logs if log.get('status') == 'success') / len(logs) * 100
+        if total_requests:
+            success_rate = summary['successes'] / total_requests * 100
             st.metric("Success Rate", f"{success_rate:.1f}%")
         else:
             st.metric("Success Rate", "N/A")
     
     with col4:
-        if logs:
-            with_citations = sum(1 for log in logs if log.get('citations_count', 0) > 0) / len(logs) * 100
+        if total_requests:
+            with_citations = summary['with_citations'] / total_requests * 100
             st.metric("Citation Rate", f"{with_citations:.1f}%")
         else:
             st.metric("Citation Rate", "N/A")
     
-    if logs:
+    if total_requests:
+        timeline = log_store.timeline(since)
+        
         st.markdown("---")
         st.subheader("Response Time Timeline")
         
         df = pd.DataFrame([{
-            'timestamp': log.get('timestamp', ''),
-            'duration': log.get('duration', 0),
-            'status': log.get('status', 'unknown')
-        } for log in logs])
+            'timestamp': datetime.fromtimestamp(row['bucket']),
+            'duration': row['duration_sum'] / row['requests'],
+            'requests': row['requests']
+        } for row in timeline if row['requests']])
         
         if not df.empty:
-            fig = px.line(df, x='timestamp', y='duration', 
-                         title='Response Time Over Time',
-                         labels={'duration': 'Duration (seconds)', 'timestamp': 'Time'})
+            fig = px.line(df, x='timestamp', y='duration', hover_data=['requests'],
+                         title=f"Average Response Time per {log_store.granularity_for(since).capitalize()}",
+                         labels={'duration': 'Avg Duration (seconds)', 'timestamp': 'Time'})
             st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No workflow data available yet. Run some tasks in the main app first!")
@@ -95,21 +103,15 @@ with tabs[0]:
 with tabs[1]:
     st.header("Agent Performance")
     
-    if logs:
-        agent_data = {}
-        for log in logs:
-            for trace in log.get('agent_trace', []):
-                agent = trace['agent']
-                if agent not in agent_data:
-                    agent_data[agent] = {'calls': 0, 'actions': []}
-                agent_data[agent]['calls'] += 1
-                agent_data[agent]['actions'].append(trace.get('action', 'unknown'))
+    agent_calls = log_store.agent_calls(since)
+    
+    if agent_calls:
+        agent_actions = log_store.agent_actions(since)
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Agent Distribution")
-            agent_calls = {agent: data['calls'] for agent, data in agent_data.items()}
             fig = px.pie(values=list(agent_calls.values()), 
                         names=list(agent_calls.keys()),
                         title='Agent Invocation Distribution',
@@ -118,19 +120,33 @@ with tabs[1]:
         
         with col2:
             st.subheader("Call Counts")
-            for agent, data in agent_data.items():
-                st.metric(f"{agent} Agent", f"{data['calls']} calls")
+            for agent, calls in agent_calls.items():
+                st.metric(f"{agent} Agent", f"{calls} calls")
         
         st.markdown("---")
         st.subheader("Agent Action Details")
-        for agent, data in agent_data.items():
+        for agent, action_counts in agent_actions.items():
             with st.expander(f"{agent} Agent Actions"):
-                action_counts = {}
-                for action in data['actions']:
-                    action_counts[action] = action_counts.get(action, 0) + 1
-                
                 for action, count in action_counts.items():
                     st.write(f"- {action}: {count}x")
+        
+        agent_latency = log_store.agent_latency(since)
+        if agent_latency:
+            st.markdown("---")
+            st.subheader("Latency Breakdown")
+            
+            latency_df = pd.DataFrame(agent_latency)
+            latency_df['retrieval_ms'] = latency_df['embedding_ms'] + latency_df['search_ms']
+            latency_df['other_ms'] = (latency_df['wall_ms'] - latency_df['llm_ms'] - latency_df['retrieval_ms']).clip(lower=0)
+            
+            fig = px.bar(latency_df, x='agent', y=['llm_ms', 'retrieval_ms', 'other_ms'],
+                        title='Average Time per Agent Call (ms)',
+                        labels={'value': 'ms', 'variable': 'Component'})
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.dataframe(latency_df[['agent', 'spans', 'wall_ms', 'llm_ms', 'ttft_ms', 'embedding_ms',
+                                     'search_ms', 'llm_calls', 'input_tokens', 'output_tokens']].round(1),
+                         use_container_width=True)
     else:
         st.info("No agent performance data available yet.")
 
@@ -239,6 +255,37 @@ with tabs[3]:
             st.success("Sentence Transformers Available")
         except:
             st.error("Sentence Transformers Not Available")
+    
+    st.subheader("Job Queue")
+    from utils.job_queue import get_job_queue
+    job_queue = get_job_queue()
+    queue_stats = job_queue.get_stats()
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Queue Depth", f"{queue_stats['queue_depth']}/{queue_stats['max_queue_size']}")
+    with col2:
+        st.metric("Workers Busy", f"{queue_stats['running']}/{queue_stats['workers']}")
+    with col3:
+        st.metric("Wait p50 / p95", f"{queue_stats['wait_p50_ms'] / 1000:.1f}s / {queue_stats['wait_p95_ms'] / 1000:.1f}s")
+    with col4:
+        st.metric("Rejected (queue full)", queue_stats['rejected'])
+    
+    st.caption(
+        f"Submitted {queue_stats['submitted']} · succeeded {queue_stats['succeeded']} · failed {queue_stats['failed']} · "
+        f"timed out {queue_stats['timed_out']} · cancelled {queue_stats['cancelled']} · peak depth {queue_stats['max_depth']}"
+    )
+    
+    jobs = job_queue.list_jobs()
+    if jobs:
+        st.dataframe(pd.DataFrame([{
+            'Job': job['id'],
+            'Task': job['task'][:60],
+            'Status': job['status'],
+            'Priority': job['priority'],
+            'Wait (s)': round(job['wait_ms'] / 1000, 1),
+            'Run (s)': round(job['run_ms'] / 1000, 1)
+        } for job in reversed(jobs)]), use_container_width=True, hide_index=True)
 
 st.markdown("---")
 
@@ -265,7 +312,7 @@ with col3:
 with col4:
     st.download_button(
         "Export Logs",
-        data=json.dumps(load_logs(), indent=2),
+        data=json.dumps(load_logs(since), indent=2),
         file_name=f"logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
         mime="application/json",
         use_container_width=True
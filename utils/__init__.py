@@ -1,3 +1,22 @@
-from .retriever import DocumentRetriever, get_retriever
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    'DocumentRetriever': '.retriever',
+    'get_retriever': '.retriever',
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
+
 
 __all__ = ['DocumentRetriever', 'get_retriever']
\ No newline at end of file
@@ -0,0 +1,148 @@
+import time
+import queue
+import threading
+import contextvars
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .instrumentation import SPAN_FIELDS, agent_span, record
+from observability.tracing import capture_spans, get_tracer
+
+
+MAX_BATCH_SIZE = 32
+MAX_WAIT_MS = 5.0
+
+_STOP = object()
+
+
+class MicroBatcher:
+    
+    def __init__(self, handler: Callable[[List[Any]], List[Any]], max_batch_size: int = MAX_BATCH_SIZE,
+                 max_wait_ms: float = MAX_WAIT_MS, name: str = "micro-batcher"):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = threading.Event()
+        self._submit_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'batches': 0, 'items': 0, 'largest_batch': 0, 'split_batches': 0}
+        self._last_batch_size = 0
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+    
+    def submit(self, item: Any) -> Future:
+        future: Future = Future()
+        with self._submit_lock:
+            if self._closed.is_set():
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((item, future, contextvars.copy_context()))
+        return future
+    
+    def call(self, item: Any, timeout: Optional[float] = None) -> Any:
+        return self.submit(item).result(timeout)
+    
+    def _collect(self, first: Tuple) -> Tuple[List[Tuple], bool]:
+        batch = [first]
+        wait = self.max_wait if self._last_batch_size > 1 else 0.0
+        deadline = time.monotonic() + wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+    
+    def _run(self) -> None:
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                break
+            batch, stop = self._collect(entry)
+            self._last_batch_size = len(batch)
+            self._dispatch(batch)
+            if stop:
+                break
+        self._drain()
+    
+    def _drain(self) -> None:
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if entry is not _STOP and entry[1].set_running_or_notify_cancel():
+                entry[1].set_exception(RuntimeError("MicroBatcher is closed"))
+    
+    def _handle(self, batch: List[Tuple]) -> List[Any]:
+        items = [item for item, _, _ in batch]
+        if len(batch) == 1:
+            return batch[0][2].run(self.handler, items)
+        
+        results, measured, spans = contextvars.Context().run(self._handle_shared, items)
+        for _, _, context in batch:
+            context.run(self._replay, measured, spans)
+        return results
+    
+    def _handle_shared(self, items: List[Any]) -> Tuple[List[Any], Dict[str, float], List]:
+        with capture_spans() as spans, agent_span(self._worker.name) as span:
+            results = self.handler(items)
+        return results, {field: span[field] for field in SPAN_FIELDS if field != 'wall_ms' and span[field]}, spans
+    
+    @staticmethod
+    def _replay(measured: Dict[str, float], spans: List) -> None:
+        for field, value in measured.items():
+            record(field, value)
+        get_tracer().replay_spans(spans)
+    
+    def _handle_each(self, batch: List[Tuple]) -> None:
+        with self._stats_lock:
+            self._stats['split_batches'] += 1
+        
+        for item, future, context in batch:
+            try:
+                result = context.run(self.handler, [item])[0]
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+    
+    def _dispatch(self, batch: List[Tuple]) -> None:
+        batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        
+        with self._stats_lock:
+            self._stats['batches'] += 1
+            self._stats['items'] += len(batch)
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+        
+        try:
+            results = self._handle(batch)
+        except Exception as e:
+            if len(batch) > 1:
+                self._handle_each(batch)
+            else:
+                batch[0][1].set_exception(e)
+            return
+        
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+    
+    def close(self, timeout: float = 5.0) -> None:
+        with self._submit_lock:
+            if self._closed.is_set():
+                return
+            self._closed.set()
+            self._queue.put(_STOP)
+        self._worker.join(timeout)
+    
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['avg_batch_size'] = stats['items'] / stats['batches'] if stats['batches'] else 0.0
+        stats['queued'] = self._queue.qsize()
+        return stats
\ No newline at end of file
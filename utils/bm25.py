@@ -0,0 +1,134 @@
+import os
+import re
+import json
+import math
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+BM25_INDEX_VERSION = 1
+TOKEN_PATTERN = re.compile(r"\$?\w+(?:[.,]\w+)*%?")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.signature = None
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._lengths: List[int] = []
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._avg_length = 0.0
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def build(self, ids: List[str], documents: List[str], metadatas: List[Dict], signature: Optional[str] = None) -> None:
+        self._ids = list(ids)
+        self._documents = list(documents)
+        self._metadatas = list(metadatas)
+        self._lengths = []
+        self._postings = {}
+        self.signature = signature
+        
+        for doc_idx, text in enumerate(self._documents):
+            counts = Counter(tokenize(text))
+            self._lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings.setdefault(term, {})[doc_idx] = tf
+        
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+    
+    def search(self, query: str, top_k: int = 5) -> List[Dict]:
+        return self.search_many([query], top_k=top_k)[0]
+    
+    def search_many(self, queries: List[str], top_k: int = 5) -> List[List[Dict]]:
+        return [self._search(query, top_k) for query in queries]
+    
+    def _search(self, query: str, top_k: int) -> List[Dict]:
+        total = len(self._ids)
+        if not total:
+            return []
+        
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_idx, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_idx] / (self._avg_length or 1))
+                scores[doc_idx] = scores.get(doc_idx, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [{
+            'id': self._ids[doc_idx],
+            'text': self._documents[doc_idx],
+            'source': self._metadatas[doc_idx]['source'],
+            'chunk_id': self._metadatas[doc_idx]['chunk_id'],
+            'bm25_score': score
+        } for doc_idx, score in ranked]
+    
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': BM25_INDEX_VERSION,
+                'signature': self.signature,
+                'k1': self.k1,
+                'b': self.b,
+                'ids': self._ids,
+                'documents': self._documents,
+                'metadatas': self._metadatas
+            }, f)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: Path) -> Optional['BM25Index']:
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if data.get('version') != BM25_INDEX_VERSION:
+            return None
+        
+        index = cls(k1=data['k1'], b=data['b'])
+        index.build(data['ids'], data['documents'], data['metadatas'], signature=data['signature'])
+        return index
+
+
+def reciprocal_rank_fusion(rankings: List[List[Dict]], top_k: int, k: int = 60) -> List[Dict]:
+    fused: Dict[Tuple[str, int], Dict] = {}
+    scores: Dict[Tuple[str, int], float] = {}
+    
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, 1):
+            key = (doc['source'], doc['chunk_id'])
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            merged = fused.setdefault(key, {})
+            for field, value in doc.items():
+                if value is not None or field not in merged:
+                    merged[field] = value
+    
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    results = []
+    for key, score in ranked:
+        doc = dict(fused[key])
+        doc.pop('id', None)
+        doc.setdefault('distance', None)
+        doc['rrf_score'] = score
+        results.append(doc)
+    return results
\ No newline at end of file
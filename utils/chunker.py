@@ -0,0 +1,177 @@
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+CHUNK_TOKENS = 240
+OVERLAP_TOKENS = 32
+CHUNKER_VERSION = "markdown-v1"
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*\S)\s*$')
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+')
+
+
+def _approximate_tokens(text: str) -> int:
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+class TokenizerCounter:
+    
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+    
+    def __call__(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False, verbose=False))
+
+
+class MarkdownChunker:
+    
+    def __init__(self, chunk_tokens: int = CHUNK_TOKENS, overlap_tokens: int = OVERLAP_TOKENS,
+                 count_tokens: Optional[Callable[[str], int]] = None):
+        if overlap_tokens >= chunk_tokens:
+            raise ValueError(f"overlap_tokens ({overlap_tokens}) must be smaller than chunk_tokens ({chunk_tokens})")
+        
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = count_tokens or _approximate_tokens
+    
+    @property
+    def _max_unit_tokens(self) -> int:
+        return self.chunk_tokens - self.overlap_tokens
+    
+    def _limit(self, trail: List[str]) -> int:
+        if not trail:
+            return self.chunk_tokens
+        context_tokens = self.count_tokens(f"[{' > '.join(trail)}]") + 1
+        return max(self.chunk_tokens - context_tokens, self._max_unit_tokens)
+    
+    def config(self) -> Dict:
+        return {
+            'chunker': CHUNKER_VERSION,
+            'chunk_tokens': self.chunk_tokens,
+            'chunk_overlap': self.overlap_tokens
+        }
+    
+    def chunk(self, content: str, source: str) -> List[Dict]:
+        chunks = []
+        current: List[Tuple[str, int]] = []
+        current_tokens = 0
+        current_trail: List[str] = []
+        
+        for trail, units in self._sections(content):
+            section_tokens = sum(tokens for _, tokens in units)
+            
+            if current and current_tokens + section_tokens <= self._limit(current_trail):
+                current.extend(units)
+                current_tokens += section_tokens
+                continue
+            
+            if current:
+                chunks.append(self._make_chunk(current, current_trail, source))
+                current, current_tokens = [], 0
+            current_trail = trail
+            limit = self._limit(trail)
+            
+            for unit in units:
+                if current and current_tokens + unit[1] > limit:
+                    chunks.append(self._make_chunk(current, current_trail, source))
+                    current = self._overlap(current)
+                    current_tokens = sum(tokens for _, tokens in current)
+                    while current and current_tokens + unit[1] > limit:
+                        current_tokens -= current.pop(0)[1]
+                current.append(unit)
+                current_tokens += unit[1]
+        
+        if current:
+            chunks.append(self._make_chunk(current, current_trail, source))
+        
+        return chunks if chunks else [{'text': content, 'source': source, 'heading': ""}]
+    
+    def _sections(self, content: str) -> List[Tuple[List[str], List[Tuple[str, int]]]]:
+        sections = []
+        trail: List[Tuple[int, str]] = []
+        lines: List[str] = []
+        
+        def close_section():
+            text = '\n'.join(lines).strip()
+            if text:
+                sections.append(([title for _, title in trail], self._units(text)))
+        
+        for line in content.split('\n'):
+            match = HEADING_PATTERN.match(line)
+            if match:
+                close_section()
+                level = len(match.group(1))
+                trail = [(lvl, title) for lvl, title in trail if lvl < level] + [(level, match.group(2))]
+                lines = [line]
+            else:
+                lines.append(line)
+        close_section()
+        
+        return sections
+    
+    def _units(self, text: str) -> List[Tuple[str, int]]:
+        units = []
+        for paragraph in re.split(r'\n\s*\n', text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            
+            tokens = self.count_tokens(paragraph)
+            if tokens <= self._max_unit_tokens:
+                units.append((paragraph, tokens))
+                continue
+            
+            for piece in self._split_oversize(paragraph):
+                units.append((piece, self.count_tokens(piece)))
+        return units
+    
+    def _split_oversize(self, paragraph: str) -> List[str]:
+        pieces = []
+        separator = '\n' if '\n' in paragraph else ' '
+        parts = paragraph.split('\n') if separator == '\n' else SENTENCE_PATTERN.split(paragraph)
+        
+        for part in parts:
+            if self.count_tokens(part) <= self._max_unit_tokens:
+                pieces.append(part)
+                continue
+            
+            words = part.split()
+            current = []
+            for word in words:
+                current.append(word)
+                if self.count_tokens(' '.join(current)) > self._max_unit_tokens and len(current) > 1:
+                    current.pop()
+                    pieces.append(' '.join(current))
+                    current = [word]
+            if current:
+                pieces.append(' '.join(current))
+        
+        return pieces
+    
+    def _overlap(self, units: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        if self.overlap_tokens <= 0:
+            return []
+        
+        kept = []
+        total = 0
+        for text, tokens in reversed(units):
+            if total + tokens > self.overlap_tokens:
+                if not kept:
+                    words = text.split()
+                    tail = []
+                    while words and self.count_tokens(' '.join([words[-1]] + tail)) <= self.overlap_tokens:
+                        tail.insert(0, words.pop())
+                    if tail:
+                        tail_text = ' '.join(tail)
+                        kept.insert(0, (tail_text, self.count_tokens(tail_text)))
+                break
+            kept.insert(0, (text, tokens))
+            total += tokens
+        return kept
+    
+    def _make_chunk(self, units: List[Tuple[str, int]], trail: List[str], source: str) -> Dict:
+        text = '\n\n'.join(text for text, _ in units)
+        context = trail[:-1] if HEADING_PATTERN.match(units[0][0].split('\n', 1)[0]) else trail
+        if context:
+            text = f"[{' > '.join(context)}]\n{text}"
+        return {'text': text, 'source': source, 'heading': ' > '.join(trail)}
\ No newline at end of file
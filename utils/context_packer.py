@@ -0,0 +1,174 @@
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+
+CONTEXT_BUDGETS = {
+    'research': 3000,
+    'writer': 6000,
+    'verifier': 6000
+}
+MIN_TRIMMED_TOKENS = 64
+MIN_DEDUPE_CHARS = 24
+TIKTOKEN_ENCODING = "cl100k_base"
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+                except Exception:
+                    _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def get_context_budget(agent: str) -> int:
+    return int(os.getenv(f"CONTEXT_BUDGET_{agent.upper()}", CONTEXT_BUDGETS[agent]))
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(text.lower().split())
+
+
+def _overlap(left: str, right: str, min_length: int = 20) -> int:
+    max_length = min(len(left), len(right))
+    for length in range(max_length, min_length - 1, -1):
+        if left.endswith(right[:length]):
+            return length
+    return 0
+
+
+def _trim(text: str, budget: int) -> str:
+    if count_tokens(text) <= budget:
+        return text
+    
+    kept = []
+    used = 0
+    for line in text.split('\n'):
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    
+    if not kept:
+        sentences = re.split(r'(?<=[.!?])\s+', text)
+        for sentence in sentences:
+            cost = count_tokens(sentence) + 1
+            if used + cost > budget:
+                break
+            kept.append(sentence)
+            used += cost
+        return ' '.join(kept) + " [...]" if kept else ""
+    
+    return '\n'.join(kept) + "\n[...]"
+
+
+def dedupe_documents(docs: List[Dict]) -> List[Dict]:
+    unique = []
+    seen_chunks = set()
+    for doc in docs:
+        key = (doc['source'], doc.get('chunk_id'))
+        if key in seen_chunks:
+            continue
+        seen_chunks.add(key)
+        
+        normalized = _normalize(doc['text'])
+        if any(doc['source'] == kept['source'] and normalized in _normalize(kept['text']) for kept in unique):
+            continue
+        unique = [kept for kept in unique
+                  if not (kept['source'] == doc['source'] and _normalize(kept['text']) in normalized)]
+        unique.append(doc)
+    return unique
+
+
+def pack_documents(docs: List[Dict], budget: int) -> str:
+    if not docs:
+        return "No documents found."
+    
+    selected = []
+    used = 0
+    for rank, doc in enumerate(dedupe_documents(docs)):
+        cost = count_tokens(doc['text']) + 16
+        remaining = budget - used
+        if cost <= remaining:
+            selected.append((rank, doc, doc['text'], False))
+            used += cost
+        elif remaining - 16 >= MIN_TRIMMED_TOKENS:
+            trimmed = _trim(doc['text'], remaining - 16)
+            if trimmed:
+                selected.append((rank, doc, trimmed, True))
+                used += count_tokens(trimmed) + 16
+    
+    blocks = []
+    for rank, doc, text, trimmed in sorted(selected, key=lambda item: (item[1]['source'], item[1].get('chunk_id') or 0)):
+        previous = blocks[-1] if blocks else None
+        if (previous and not trimmed and not previous['trimmed'] and previous['source'] == doc['source']
+                and doc.get('chunk_id') is not None and previous['last_chunk'] is not None
+                and doc['chunk_id'] == previous['last_chunk'] + 1):
+            context_line, _, body = text.partition('\n')
+            if context_line.startswith('[') and context_line.endswith(']') and '](' not in context_line:
+                text = body
+            overlap = _overlap(previous['text'], text)
+            previous['text'] = previous['text'] + ("\n\n" + text if not overlap else text[overlap:])
+            previous['last_chunk'] = doc['chunk_id']
+            previous['rank'] = min(previous['rank'], rank)
+        else:
+            blocks.append({
+                'source': doc['source'],
+                'text': text,
+                'last_chunk': doc.get('chunk_id'),
+                'rank': rank,
+                'trimmed': trimmed
+            })
+    
+    formatted = []
+    for idx, block in enumerate(sorted(blocks, key=lambda block: block['rank']), 1):
+        formatted.append(f"--- Document {idx} [Source: {block['source']}] ---")
+        formatted.append(block['text'])
+        formatted.append("")
+    
+    return "\n".join(formatted)
+
+
+def _is_fact_line(line: str) -> bool:
+    if not line or line.startswith(('#', '|')):
+        return False
+    return len(_normalize(line.strip('-*• '))) >= MIN_DEDUPE_CHARS
+
+
+def pack_notes(notes: str, budget: Optional[int]) -> str:
+    if not notes or budget is None:
+        return notes
+    
+    kept_lines = []
+    seen = set()
+    in_code = False
+    for line in notes.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith('```'):
+            in_code = not in_code
+        elif not in_code and _is_fact_line(stripped):
+            normalized = _normalize(stripped.strip('-*• '))
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+        kept_lines.append(line)
+    
+    packed = re.sub(r'\n{3,}', '\n\n', '\n'.join(kept_lines)).strip()
+    return _trim(packed, budget)
\ No newline at end of file
@@ -0,0 +1,236 @@
+import json
+import platform
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from .chunker import TokenizerCounter
+
+
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+EMBEDDING_BACKENDS = ('sentence-transformers', 'onnx', 'onnx-int8')
+DEFAULT_MAX_SEQ_LENGTH = 256
+QUANTIZED_ONNX_FILES = {
+    'arm64': 'onnx/model_qint8_arm64.onnx',
+    'aarch64': 'onnx/model_qint8_arm64.onnx',
+    'x86_64': 'onnx/model_quint8_avx2.onnx',
+    'amd64': 'onnx/model_quint8_avx2.onnx'
+}
+
+
+def _hub_repo(model_name: str) -> str:
+    return model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+
+
+class FastTokenizerCounter:
+    
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+    
+    def __call__(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+class EmbeddingBackend:
+    
+    name = "base"
+    quantized = False
+    
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+        self.model_name = model_name
+        self.repo_id = _hub_repo(model_name)
+        self._configs: Dict[str, Optional[object]] = {}
+        self._loaded = False
+        self._load_lock = threading.Lock()
+    
+    @property
+    def model_id(self) -> str:
+        return f"{self.model_name}:int8" if self.quantized else self.model_name
+    
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+    
+    def load(self) -> None:
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                print(f"Loading embedding model {self.model_name} ({self.name})...")
+                self._load()
+                self._loaded = True
+    
+    def _load(self) -> None:
+        raise NotImplementedError
+    
+    def _download(self, filename: str) -> str:
+        local_path = Path(self.model_name) / filename
+        if local_path.exists():
+            return str(local_path)
+        
+        from huggingface_hub import hf_hub_download
+        return hf_hub_download(self.repo_id, filename)
+    
+    def _load_json(self, filename: str):
+        if filename not in self._configs:
+            try:
+                with open(self._download(filename), 'r') as f:
+                    self._configs[filename] = json.load(f)
+            except Exception:
+                self._configs[filename] = None
+        return self._configs[filename]
+    
+    @property
+    def max_seq_length(self) -> Optional[int]:
+        config = self._load_json('sentence_bert_config.json') or {}
+        return config.get('max_seq_length', DEFAULT_MAX_SEQ_LENGTH)
+    
+    def token_counter(self) -> Optional[Callable[[str], int]]:
+        try:
+            from tokenizers import Tokenizer
+            tokenizer = Tokenizer.from_file(self._download('tokenizer.json'))
+        except Exception:
+            return None
+        
+        tokenizer.no_truncation()
+        tokenizer.no_padding()
+        return FastTokenizerCounter(tokenizer)
+    
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        self.load()
+        return self._encode(texts, batch_size)
+    
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        raise NotImplementedError
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    
+    name = "sentence-transformers"
+    
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+        super().__init__(model_name)
+        self.model = None
+    
+    def _load(self) -> None:
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(self.model_name)
+    
+    @property
+    def max_seq_length(self) -> Optional[int]:
+        if self.model is not None:
+            return getattr(self.model, 'max_seq_length', None)
+        return super().max_seq_length
+    
+    def token_counter(self) -> Optional[Callable[[str], int]]:
+        counter = super().token_counter()
+        if counter is not None or not self.loaded:
+            return counter
+        
+        tokenizer = getattr(self.model, 'tokenizer', None)
+        return TokenizerCounter(tokenizer) if tokenizer is not None else None
+    
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+
+class ONNXBackend(EmbeddingBackend):
+    
+    name = "onnx"
+    
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, quantized: bool = False):
+        super().__init__(model_name)
+        self.quantized = quantized
+        self.session = None
+        self.tokenizer = None
+    
+    def _load(self) -> None:
+        import onnxruntime
+        from tokenizers import Tokenizer
+        
+        self.pooling = self._pooling_mode()
+        self.normalize = any(
+            module.get('type', '').endswith('Normalize')
+            for module in self._load_json('modules.json') or []
+        )
+        
+        self.tokenizer = Tokenizer.from_file(self._download('tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        if self.tokenizer.padding is None:
+            self.tokenizer.enable_padding()
+        
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            self._model_path(),
+            sess_options=options,
+            providers=['CPUExecutionProvider']
+        )
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+    
+    def _pooling_mode(self) -> str:
+        config = self._load_json('1_Pooling/config.json') or {'pooling_mode_mean_tokens': True}
+        if config.get('pooling_mode_mean_tokens'):
+            return 'mean'
+        if config.get('pooling_mode_cls_token'):
+            return 'cls'
+        raise ValueError(f"Unsupported pooling mode for ONNX backend: {config}")
+    
+    def _model_path(self) -> str:
+        if not self.quantized:
+            return self._download('onnx/model.onnx')
+        
+        quantized_file = QUANTIZED_ONNX_FILES.get(platform.machine().lower())
+        if quantized_file:
+            try:
+                return self._download(quantized_file)
+            except Exception:
+                pass
+        
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        
+        source = Path(self._download('onnx/model.onnx'))
+        target = source.with_name('model_int8_dynamic.onnx')
+        if not target.exists():
+            print(f"Quantizing {self.repo_id} to int8...")
+            quantize_dynamic(str(source), str(target), weight_type=QuantType.QInt8)
+        return str(target)
+    
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+            attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+            
+            inputs = {'input_ids': input_ids, 'attention_mask': attention_mask}
+            if 'token_type_ids' in self._input_names:
+                inputs['token_type_ids'] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+            
+            token_embeddings = self.session.run(None, inputs)[0]
+            batches.append(self._pool(token_embeddings, attention_mask))
+        
+        if not batches:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(batches).astype(np.float32)
+    
+    def _pool(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.pooling == 'cls':
+            pooled = token_embeddings[:, 0]
+        else:
+            mask = attention_mask[..., None].astype(token_embeddings.dtype)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        
+        if self.normalize:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+
+def create_embedding_backend(name: str = "sentence-transformers", model_name: str = EMBEDDING_MODEL_NAME) -> EmbeddingBackend:
+    if name == 'sentence-transformers':
+        return SentenceTransformerBackend(model_name)
+    if name == 'onnx':
+        return ONNXBackend(model_name)
+    if name == 'onnx-int8':
+        return ONNXBackend(model_name, quantized=True)
+    raise ValueError(f"Unknown embedding backend '{name}'. Expected one of: {', '.join(EMBEDDING_BACKENDS)}")
\ No newline at end of file
@@ -0,0 +1,287 @@
+import os
+import time
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from .chunker import MarkdownChunker
+
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+INGEST_WORKERS = min(4, os.cpu_count() or 1)
+INLINE_FILE_LIMIT = 16
+MAX_IN_FLIGHT_PER_WORKER = 4
+PROGRESS_INTERVAL = 5.0
+CHECKPOINT_INTERVAL = 5.0
+VERBOSE_FILE_LIMIT = 100
+
+_worker_chunker: Optional[MarkdownChunker] = None
+
+
+def _init_worker(chunker: MarkdownChunker) -> None:
+    global _worker_chunker
+    _worker_chunker = chunker
+
+
+def read_and_chunk(path: str, known_hash: Optional[str] = None,
+                   chunker: Optional[MarkdownChunker] = None) -> Tuple[str, Optional[List[Dict]]]:
+    raw = Path(path).read_bytes()
+    file_hash = hashlib.sha256(raw).hexdigest()
+    if file_hash == known_hash:
+        return file_hash, None
+    
+    chunks = (chunker or _worker_chunker).chunk(raw.decode('utf-8'), Path(path).name)
+    return file_hash, chunks
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class IngestionPipeline:
+    
+    def __init__(self, retriever, manifest: Dict, workers: int = INGEST_WORKERS, batch_size: int = 64):
+        self.retriever = retriever
+        self.manifest = manifest
+        self.workers = workers
+        self.batch_size = batch_size
+        
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._embeddings: List[Optional[List[float]]] = []
+        self._batch_files: List[str] = []
+        self._update_ids: List[str] = []
+        self._update_metadatas: List[Dict] = []
+        self._stale_ids: List[str] = []
+        self._pending: Dict[str, List] = {}
+        
+        self.stats = {
+            'files': 0,
+            'changed_files': 0,
+            'indexed_chunks': 0,
+            'reused_chunks': 0,
+            'updated_chunks': 0,
+            'deleted_chunks': 0,
+            'indexed_sources': set(),
+            'seconds': 0.0
+        }
+        self._started = self._last_report = self._last_checkpoint = time.perf_counter()
+        self._reported = False
+    
+    def run(self, files: List[Path]) -> Dict:
+        data_dir = self.retriever.data_dir
+        keyed_files = [(file_path, file_path.relative_to(data_dir).as_posix()) for file_path in files]
+        verbose = len(keyed_files) <= VERBOSE_FILE_LIMIT
+        
+        self._remove_missing({file_key for _, file_key in keyed_files})
+        
+        for file_path, file_key, result in self._read(keyed_files):
+            self.stats['files'] += 1
+            if isinstance(result, Exception):
+                print(f"  ✗ Error loading {file_path.name}: {result}")
+            else:
+                file_hash, chunks = result
+                if chunks is not None:
+                    self._add_file(file_path, file_key, file_hash, chunks, verbose)
+            self._report(len(keyed_files))
+        
+        self._flush()
+        self._checkpoint(force=True)
+        if self._reported:
+            self._report(len(keyed_files), force=True)
+        
+        self.stats['seconds'] = time.perf_counter() - self._started
+        return self.stats
+    
+    def _remove_missing(self, seen_files: set) -> None:
+        removed = [file_key for file_key in self.manifest['files'] if file_key not in seen_files]
+        if not removed:
+            return
+        
+        for file_key in removed:
+            entry = self.manifest['files'][file_key]
+            self._stale_ids.extend(f"{entry['stem']}_{idx}" for idx in range(len(entry['chunks'])))
+            print(f"  - Removed {entry['source']} ({len(entry['chunks'])} chunks)")
+        
+        self._flush()
+        for file_key in removed:
+            self.manifest['files'].pop(file_key)
+        self._checkpoint(force=True)
+    
+    def _read(self, keyed_files: List[Tuple[Path, str]]) -> Iterator[Tuple[Path, str, Union[Tuple, Exception]]]:
+        known_hash = lambda file_key: (self.manifest['files'].get(file_key) or {}).get('file_hash')
+        
+        if self.workers <= 1 or len(keyed_files) <= INLINE_FILE_LIMIT:
+            for file_path, file_key in keyed_files:
+                try:
+                    result = read_and_chunk(str(file_path), known_hash(file_key), self.retriever.chunker)
+                except Exception as e:
+                    result = e
+                yield file_path, file_key, result
+            return
+        
+        window = self.workers * MAX_IN_FLIGHT_PER_WORKER
+        in_flight: deque = deque()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.retriever.chunker,)) as executor:
+            for file_path, file_key in keyed_files:
+                future = executor.submit(read_and_chunk, str(file_path), known_hash(file_key))
+                in_flight.append((file_path, file_key, future))
+                if len(in_flight) >= window:
+                    yield self._result(*in_flight.popleft())
+            
+            while in_flight:
+                yield self._result(*in_flight.popleft())
+    
+    @staticmethod
+    def _result(file_path: Path, file_key: str, future: Future) -> Tuple[Path, str, Union[Tuple, Exception]]:
+        try:
+            return file_path, file_key, future.result()
+        except Exception as e:
+            return file_path, file_key, e
+    
+    def _add_file(self, file_path: Path, file_key: str, file_hash: str, chunks: List[Dict], verbose: bool) -> None:
+        entry = self.manifest['files'].get(file_key)
+        old_hashes = entry['chunks'] if entry else []
+        chunk_hashes = [hash_text(chunk['text']) for chunk in chunks]
+        
+        reusable = self._reusable_embeddings(entry, old_hashes, chunk_hashes)
+        
+        pending = [{
+            'file_hash': file_hash,
+            'stem': file_path.stem,
+            'source': file_path.name,
+            'chunks': chunk_hashes
+        }, 1]
+        self._pending[file_key] = pending
+        changed = 0
+        reused = 0
+        
+        for idx, chunk in enumerate(chunks):
+            chunk_id = f"{file_path.stem}_{idx}"
+            metadata = {
+                'source': chunk['source'],
+                'chunk_id': idx,
+                'total_chunks': len(chunks),
+                'heading': chunk.get('heading', "")
+            }
+            
+            if idx < len(old_hashes) and old_hashes[idx] == chunk_hashes[idx]:
+                if len(old_hashes) != len(chunks):
+                    self._update_ids.append(chunk_id)
+                    self._update_metadatas.append(metadata)
+                continue
+            
+            embedding = reusable.get(chunk_hashes[idx])
+            self._ids.append(chunk_id)
+            self._documents.append(chunk['text'])
+            self._metadatas.append(metadata)
+            self._embeddings.append(embedding)
+            self._batch_files.append(file_key)
+            pending[1] += 1
+            if embedding is None:
+                changed += 1
+            else:
+                reused += 1
+            
+            if len(self._ids) >= self.batch_size:
+                self._flush()
+        
+        self._stale_ids.extend(f"{file_path.stem}_{idx}" for idx in range(len(chunks), len(old_hashes)))
+        pending[1] -= 1
+        self.stats['changed_files'] += 1
+        
+        if verbose:
+            moved = f", {reused} moved" if reused else ""
+            print(f"  ✓ Loaded {file_path.name} ({len(chunks)} chunks, {changed} new or changed{moved})")
+        
+        if len(self._update_ids) + len(self._stale_ids) >= self.batch_size:
+            self._flush()
+    
+    def _reusable_embeddings(self, entry: Optional[Dict], old_hashes: List[str],
+                             chunk_hashes: List[str]) -> Dict[str, List[float]]:
+        old_ids = {}
+        for idx, chunk_hash in enumerate(old_hashes):
+            old_ids.setdefault(chunk_hash, f"{entry['stem']}_{idx}")
+        
+        wanted = {}
+        for idx, chunk_hash in enumerate(chunk_hashes):
+            if chunk_hash in old_ids and not (idx < len(old_hashes) and old_hashes[idx] == chunk_hash):
+                wanted[old_ids[chunk_hash]] = chunk_hash
+        if not wanted:
+            return {}
+        
+        found = self.retriever.collection.get(ids=list(wanted), include=['embeddings'])
+        embeddings = found.get('embeddings')
+        if embeddings is None:
+            return {}
+        
+        return {
+            wanted[chunk_id]: embedding.tolist() if hasattr(embedding, 'tolist') else list(embedding)
+            for chunk_id, embedding in zip(found['ids'], embeddings)
+            if embedding is not None
+        }
+    
+    def _flush(self) -> None:
+        collection = self.retriever.collection
+        
+        if self._ids:
+            missing = [idx for idx, embedding in enumerate(self._embeddings) if embedding is None]
+            if missing:
+                encoded = self.retriever.embedder.encode([self._documents[idx] for idx in missing],
+                                                         batch_size=self.batch_size).tolist()
+                for idx, embedding in zip(missing, encoded):
+                    self._embeddings[idx] = embedding
+            
+            collection.upsert(
+                documents=self._documents,
+                embeddings=self._embeddings,
+                metadatas=self._metadatas,
+                ids=self._ids
+            )
+            
+            self.stats['indexed_chunks'] += len(missing)
+            self.stats['reused_chunks'] += len(self._ids) - len(missing)
+            self.stats['indexed_sources'].update(metadata['source'] for metadata in self._metadatas)
+            for file_key in self._batch_files:
+                self._pending[file_key][1] -= 1
+        
+        if self._update_ids:
+            collection.update(ids=self._update_ids, metadatas=self._update_metadatas)
+            self.stats['updated_chunks'] += len(self._update_ids)
+        
+        if self._stale_ids:
+            collection.delete(ids=self._stale_ids)
+            self.stats['deleted_chunks'] += len(self._stale_ids)
+        
+        self._ids, self._documents, self._metadatas, self._embeddings, self._batch_files = [], [], [], [], []
+        self._update_ids, self._update_metadatas, self._stale_ids = [], [], []
+        
+        for file_key, (entry, remaining) in list(self._pending.items()):
+            if remaining == 0:
+                self.manifest['files'][file_key] = entry
+                del self._pending[file_key]
+        
+        self._checkpoint()
+    
+    def _checkpoint(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if force or now - self._last_checkpoint >= CHECKPOINT_INTERVAL:
+            self.retriever._save_manifest(self.manifest)
+            self._last_checkpoint = now
+    
+    def _report(self, total: int, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self._last_report < PROGRESS_INTERVAL:
+            return
+        
+        elapsed = now - self._started
+        done = self.stats['files']
+        rate = self.stats['indexed_chunks'] / elapsed if elapsed > 0 else 0.0
+        print(f"  Progress: {done}/{total} files ({done / total * 100 if total else 100:.0f}%), "
+              f"{self.stats['indexed_chunks']} chunks indexed ({rate:.1f} chunks/s)")
+        self._last_report = now
+        self._reported = True
\ No newline at end of file
@@ -0,0 +1,78 @@
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterator
+
+
+SPAN_FIELDS = (
+    'wall_ms',
+    'llm_ms',
+    'embedding_ms',
+    'search_ms',
+    'llm_calls',
+    'cached_llm_calls',
+    'input_tokens',
+    'output_tokens'
+)
+
+_lock = threading.Lock()
+_current_span: ContextVar[Optional[Dict[str, Any]]] = ContextVar('agent_span', default=None)
+
+
+def _new_span(agent: str) -> Dict[str, Any]:
+    span = {'agent': agent, 'started_at': datetime.now().isoformat(), 'ttft_ms': None}
+    for field in SPAN_FIELDS:
+        span[field] = 0
+    return span
+
+
+@contextmanager
+def agent_span(agent: str) -> Iterator[Dict[str, Any]]:
+    span = _new_span(agent)
+    token = _current_span.set(span)
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        span['wall_ms'] = (time.perf_counter() - start) * 1000
+        _current_span.reset(token)
+
+
+def current_span() -> Optional[Dict[str, Any]]:
+    return _current_span.get()
+
+
+def record(field: str, value: float) -> None:
+    span = _current_span.get()
+    if span is not None:
+        with _lock:
+            span[field] = span.get(field, 0) + value
+
+
+@contextmanager
+def timed(field: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(field, (time.perf_counter() - start) * 1000)
+
+
+def record_llm_call(latency: float, ttft: Optional[float] = None, usage: Optional[Dict] = None,
+                    cached: bool = False) -> None:
+    span = _current_span.get()
+    if span is None:
+        return
+    
+    with _lock:
+        span['llm_ms'] += latency * 1000
+        span['llm_calls'] += 1
+        if cached:
+            span['cached_llm_calls'] += 1
+        if ttft is not None and span['ttft_ms'] is None:
+            span['ttft_ms'] = ttft * 1000
+        if usage:
+            span['input_tokens'] += usage.get('input_tokens', 0) or 0
+            span['output_tokens'] += usage.get('output_tokens', 0) or 0
\ No newline at end of file
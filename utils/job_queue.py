@@ -0,0 +1,320 @@
+import os
+import time
+import uuid
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, CancelledError
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from observability.tracing import get_tracer
+
+
+JOB_WORKERS = 2
+JOB_QUEUE_SIZE = 32
+JOB_TIMEOUT = 300.0
+JOB_HISTORY = 200
+WAIT_SAMPLES = 1000
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, TIMED_OUT, CANCELLED)
+
+_STOP_PRIORITY = float('inf')
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobTimeoutError(Exception):
+    pass
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def _run_workflow(user_task: str, multi_output: bool = False, use_cache: bool = False,
+                        on_token: Optional[Callable[[str, str], None]] = None):
+    from graph import arun_workflow
+    return await arun_workflow(user_task, multi_output=multi_output, use_cache=use_cache, on_token=on_token)
+
+
+class Job:
+    
+    def __init__(self, task: str, multi_output: bool = False, use_cache: bool = False,
+                 priority: int = 0, timeout: Optional[float] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.task = task
+        self.multi_output = multi_output
+        self.use_cache = use_cache
+        self.priority = priority
+        self.timeout = timeout
+        self.status = QUEUED
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.output: Dict[str, str] = {}
+        self.future: Future = Future()
+        self._task: Optional[asyncio.Task] = None
+        self._cancel_requested = False
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+    
+    @property
+    def wait_seconds(self) -> float:
+        return (self.started_at or self.finished_at or time.time()) - self.submitted_at
+    
+    def on_token(self, section: str, token: Optional[str]) -> None:
+        if token is None:
+            self.output.pop(section, None)
+            return
+        self.output[section] = self.output.get(section, "") + token
+    
+    def to_dict(self) -> Dict[str, Any]:
+        finished_at = self.finished_at or time.time()
+        return {
+            'id': self.id,
+            'task': self.task,
+            'status': self.status,
+            'priority': self.priority,
+            'multi_output': self.multi_output,
+            'submitted_at': self.submitted_at,
+            'wait_ms': self.wait_seconds * 1000,
+            'run_ms': (finished_at - self.started_at) * 1000 if self.started_at else 0.0,
+            'error': self.error,
+            'output': dict(self.output)
+        }
+
+
+class JobQueue:
+    
+    def __init__(self, workers: int = JOB_WORKERS, max_queue_size: int = JOB_QUEUE_SIZE,
+                 default_timeout: Optional[float] = JOB_TIMEOUT, history: int = JOB_HISTORY,
+                 runner: Callable[..., Awaitable[Any]] = _run_workflow):
+        if workers < 1:
+            raise ValueError("JobQueue needs at least one worker")
+        
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.default_timeout = default_timeout or None
+        self.history = history
+        self.runner = runner
+        self._jobs: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._queued = 0
+        self._running = 0
+        self._waits: deque = deque(maxlen=WAIT_SAMPLES)
+        self._stats = {
+            'submitted': 0, 'rejected': 0, 'max_depth': 0,
+            SUCCEEDED: 0, FAILED: 0, TIMED_OUT: 0, CANCELLED: 0
+        }
+        self._closed = False
+        
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="job-queue", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+    
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._workers = [self._loop.create_task(self._worker()) for _ in range(self.workers)]
+        self._loop.call_soon(self._ready.set)
+        self._loop.run_until_complete(asyncio.gather(*self._workers))
+        self._loop.close()
+    
+    def submit(self, task: str, multi_output: bool = False, use_cache: bool = False,
+               priority: int = 0, timeout: Optional[float] = None) -> str:
+        job = Job(task, multi_output, use_cache, priority, timeout if timeout is not None else self.default_timeout)
+        
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("JobQueue is shut down")
+            if self._queued >= self.max_queue_size:
+                self._stats['rejected'] += 1
+                raise QueueFullError(f"Job queue is full ({self._queued} waiting); try again shortly")
+            
+            self._queued += 1
+            self._sequence += 1
+            self._stats['submitted'] += 1
+            self._stats['max_depth'] = max(self._stats['max_depth'], self._queued)
+            self._jobs[job.id] = job
+            self._evict()
+            entry = (-priority, self._sequence, job)
+        
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, entry)
+        return job.id
+    
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.get(job_id)
+        return job.to_dict() if job is not None else None
+    
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.to_dict() for job in jobs]
+    
+    def result(self, job_id: str, timeout: Optional[float] = None):
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(f"Unknown job '{job_id}'")
+        return job.future.result(timeout)
+    
+    def cancel(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            if job.status == QUEUED:
+                self._queued -= 1
+                self._finish(job, CANCELLED)
+                job.future.cancel()
+                return True
+            job._cancel_requested = True
+            task = job._task
+        
+        if task is not None:
+            self._loop.call_soon_threadsafe(task.cancel)
+        return True
+    
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        self._stats[status] += 1
+    
+    async def _worker(self) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            if job is None:
+                return
+            
+            with self._lock:
+                if job.status != QUEUED:
+                    continue
+                self._queued -= 1
+                self._running += 1
+                job.status = RUNNING
+                job.started_at = time.time()
+                self._waits.append(job.wait_seconds)
+            
+            if not job.future.set_running_or_notify_cancel():
+                with self._lock:
+                    self._running -= 1
+                    self._finish(job, CANCELLED)
+                continue
+            
+            await self._execute(job)
+    
+    async def _execute(self, job: Job) -> None:
+        attributes = {
+            'job.id': job.id,
+            'job.priority': job.priority,
+            'job.queue_wait_ms': job.wait_seconds * 1000
+        }
+        with get_tracer().start_span("job_queue.job", attributes) as span:
+            coroutine = self.runner(job.task, multi_output=job.multi_output, use_cache=job.use_cache, on_token=job.on_token)
+            with self._lock:
+                job._task = self._loop.create_task(asyncio.wait_for(coroutine, job.timeout))
+                if job._cancel_requested:
+                    job._task.cancel()
+            await asyncio.wait([job._task])
+            
+            result, error, exception = None, None, None
+            if job._task.cancelled():
+                status = CANCELLED
+                error = "Cancelled while running"
+            elif isinstance(job._task.exception(), asyncio.TimeoutError):
+                status = TIMED_OUT
+                error = f"Exceeded the {job.timeout:g}s job timeout"
+            elif job._task.exception() is not None:
+                status = FAILED
+                exception = job._task.exception()
+                error = str(exception) or type(exception).__name__
+            else:
+                status = SUCCEEDED
+                result = job._task.result()
+            
+            with self._lock:
+                self._running -= 1
+                self._finish(job, status, error)
+                job._task = None
+            
+            if span is not None:
+                span.set_attribute('job.status', status)
+        
+        if status == SUCCEEDED:
+            job.future.set_result(result)
+        elif status == CANCELLED:
+            job.future.set_exception(CancelledError(error))
+        elif status == TIMED_OUT:
+            job.future.set_exception(JobTimeoutError(error))
+        else:
+            job.future.set_exception(exception)
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['queue_depth'] = self._queued
+            stats['running'] = self._running
+            waits = list(self._waits)
+        
+        stats['workers'] = self.workers
+        stats['max_queue_size'] = self.max_queue_size
+        stats['wait_p50_ms'] = _percentile(waits, 50) * 1000
+        stats['wait_p95_ms'] = _percentile(waits, 95) * 1000
+        stats['wait_max_ms'] = max(waits) * 1000 if waits else 0.0
+        return stats
+    
+    def shutdown(self, cancel_pending: bool = True, timeout: float = 10.0) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            pending = [job.id for job in self._jobs.values() if job.status == QUEUED]
+        
+        if cancel_pending:
+            for job_id in pending:
+                self.cancel(job_id)
+        for index in range(self.workers):
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, (_STOP_PRIORITY, index, None))
+        self._thread.join(timeout)
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue(
+                    workers=int(os.getenv("JOB_WORKERS", JOB_WORKERS)),
+                    max_queue_size=int(os.getenv("JOB_QUEUE_SIZE", JOB_QUEUE_SIZE)),
+                    default_timeout=float(os.getenv("JOB_TIMEOUT", JOB_TIMEOUT))
+                )
+    return _job_queue
\ No newline at end of file
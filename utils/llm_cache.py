@@ -0,0 +1,284 @@
+import os
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Any, Callable, Tuple
+from langchain_core.messages import AIMessage
+from .instrumentation import record_llm_call
+from observability.tracing import get_tracer, current_span
+
+
+CACHE_MODES = ('off', 'read', 'read_write', 'record', 'replay')
+CACHE_PATH = "llm_cache.db"
+MAX_ENTRIES = 5000
+
+
+class LLMCacheMiss(Exception):
+    pass
+
+
+class LLMCache:
+    
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES, mode: str = "read_write"):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode '{mode}'. Expected one of: {', '.join(CACHE_MODES)}")
+        
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+        self._conn = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    temperature REAL,
+                    prompt TEXT,
+                    response TEXT,
+                    created_at REAL,
+                    last_access REAL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+            self._conn.commit()
+        return self._conn
+    
+    @staticmethod
+    def make_key(model: str, temperature: Optional[float], prompt: str) -> str:
+        payload = f"{model}\x00{temperature}\x00{prompt}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            self.hits += 1
+            return row[0]
+    
+    def put(self, key: str, model: str, temperature: Optional[float], prompt: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, temperature, prompt, response, now, now)
+            )
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            conn.commit()
+            self.writes += 1
+    
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            size = 0
+            if self.mode != 'off':
+                size = self._connect().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'mode': self.mode,
+                'size': size,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+def _chunk_text(chunk) -> str:
+    if isinstance(chunk.content, str):
+        return chunk.content
+    return ''.join(block.get('text', '') for block in chunk.content if isinstance(block, dict))
+
+
+def _cache_entry(prompt, llm, inputs: Dict[str, Any]) -> Tuple[str, str, Optional[float], str]:
+    rendered = prompt.format_prompt(**inputs).to_string()
+    model = getattr(llm, 'model', None) or getattr(llm, 'model_name', '')
+    temperature = getattr(llm, 'temperature', None)
+    return LLMCache.make_key(model, temperature, rendered), model, temperature, rendered
+
+
+def _usage(message) -> Optional[Dict]:
+    usage = getattr(message, 'usage_metadata', None)
+    if usage:
+        return usage
+    return (getattr(message, 'response_metadata', None) or {}).get('usage')
+
+
+def _record_call(latency: float, ttft: Optional[float] = None, usage: Optional[Dict] = None,
+                 cached: bool = False) -> None:
+    record_llm_call(latency, ttft=ttft, usage=usage, cached=cached)
+    
+    span = current_span()
+    if span is not None:
+        span.set_attributes({
+            'llm.cached': cached,
+            'llm.ttft_ms': ttft * 1000 if ttft is not None else None,
+            'llm.usage.input_tokens': (usage or {}).get('input_tokens'),
+            'llm.usage.output_tokens': (usage or {}).get('output_tokens')
+        })
+
+
+def _span_attributes(llm) -> Dict[str, Any]:
+    return {
+        'llm.model': getattr(llm, 'model', None) or getattr(llm, 'model_name', ''),
+        'llm.temperature': getattr(llm, 'temperature', None),
+        'llm.cache_mode': get_llm_cache().mode
+    }
+
+
+def _stream(chain, inputs: Dict[str, Any], on_token: Optional[Callable[[Optional[str]], None]] = None) -> AIMessage:
+    start = time.perf_counter()
+    ttft = None
+    parts = []
+    aggregate = None
+    try:
+        for chunk in chain.stream(inputs):
+            aggregate = chunk if aggregate is None else aggregate + chunk
+            token = _chunk_text(chunk)
+            if token:
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                parts.append(token)
+                if on_token:
+                    on_token(token)
+    except Exception:
+        if parts and on_token:
+            on_token(None)
+        raise
+    
+    usage = _usage(aggregate) if aggregate is not None else None
+    _record_call(time.perf_counter() - start, ttft=ttft, usage=usage)
+    return AIMessage(content=''.join(parts), usage_metadata=usage) if usage else AIMessage(content=''.join(parts))
+
+
+def _cached_response(cached: str, on_token: Optional[Callable[[Optional[str]], None]], start: float) -> AIMessage:
+    if on_token:
+        on_token(cached)
+    elapsed = time.perf_counter() - start
+    _record_call(elapsed, ttft=elapsed, cached=True)
+    return AIMessage(content=cached)
+
+
+def invoke_llm(prompt, llm, inputs: Dict[str, Any], on_token: Optional[Callable[[Optional[str]], None]] = None):
+    with get_tracer().start_span("llm.invoke", _span_attributes(llm)):
+        return _invoke_llm(prompt, llm, inputs, on_token)
+
+
+def _invoke_llm(prompt, llm, inputs: Dict[str, Any], on_token: Optional[Callable[[Optional[str]], None]] = None):
+    cache = get_llm_cache()
+    chain = prompt | llm
+    
+    if cache.mode == 'off':
+        return _stream(chain, inputs, on_token)
+    
+    start = time.perf_counter()
+    key, model, temperature, rendered = _cache_entry(prompt, llm, inputs)
+    
+    if cache.mode in ('read', 'read_write', 'replay'):
+        cached = cache.get(key)
+        if cached is not None:
+            return _cached_response(cached, on_token, start)
+        if cache.mode == 'replay':
+            raise LLMCacheMiss(f"No recorded response for {model} prompt {key[:12]} (LLM_CACHE_MODE=replay)")
+    
+    response = _stream(chain, inputs, on_token)
+    if cache.mode != 'read':
+        cache.put(key, model, temperature, rendered, response.content)
+    return response
+
+
+async def _astream(chain, inputs: Dict[str, Any], on_token: Optional[Callable[[Optional[str]], None]] = None) -> AIMessage:
+    start = time.perf_counter()
+    ttft = None
+    parts = []
+    aggregate = None
+    try:
+        async for chunk in chain.astream(inputs):
+            aggregate = chunk if aggregate is None else aggregate + chunk
+            token = _chunk_text(chunk)
+            if token:
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                parts.append(token)
+                if on_token:
+                    on_token(token)
+    except Exception:
+        if parts and on_token:
+            on_token(None)
+        raise
+    
+    usage = _usage(aggregate) if aggregate is not None else None
+    _record_call(time.perf_counter() - start, ttft=ttft, usage=usage)
+    return AIMessage(content=''.join(parts), usage_metadata=usage) if usage else AIMessage(content=''.join(parts))
+
+
+async def ainvoke_llm(prompt, llm, inputs: Dict[str, Any], on_token: Optional[Callable[[Optional[str]], None]] = None):
+    with get_tracer().start_span("llm.invoke", _span_attributes(llm)):
+        return await _ainvoke_llm(prompt, llm, inputs, on_token)
+
+
+async def _ainvoke_llm(prompt, llm, inputs: Dict[str, Any], on_token: Optional[Callable[[Optional[str]], None]] = None):
+    cache = get_llm_cache()
+    chain = prompt | llm
+    
+    if cache.mode == 'off':
+        return await _astream(chain, inputs, on_token)
+    
+    start = time.perf_counter()
+    key, model, temperature, rendered = _cache_entry(prompt, llm, inputs)
+    
+    if cache.mode in ('read', 'read_write', 'replay'):
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return _cached_response(cached, on_token, start)
+        if cache.mode == 'replay':
+            raise LLMCacheMiss(f"No recorded response for {model} prompt {key[:12]} (LLM_CACHE_MODE=replay)")
+    
+    response = await _astream(chain, inputs, on_token)
+    if cache.mode != 'read':
+        await asyncio.to_thread(cache.put, key, model, temperature, rendered, response.content)
+    return response
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache() -> LLMCache:
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMCache(
+                    path=os.getenv("LLM_CACHE_PATH", CACHE_PATH),
+                    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", MAX_ENTRIES)),
+                    mode=os.getenv("LLM_CACHE_MODE", "off")
+                )
+    return _llm_cache
\ No newline at end of file
@@ -0,0 +1,275 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+GRANULARITIES = {'minute': 60, 'hour': 3600}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflows (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT,
+    ts REAL,
+    duration REAL,
+    status TEXT,
+    task TEXT,
+    citations_count INTEGER,
+    output_length INTEGER,
+    record TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_workflows_ts ON workflows (ts);
+CREATE INDEX IF NOT EXISTS idx_workflows_status ON workflows (status, ts);
+
+CREATE TABLE IF NOT EXISTS agent_calls (
+    workflow_id INTEGER,
+    ts REAL,
+    agent TEXT,
+    action TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_agent_calls_agent ON agent_calls (agent, ts);
+CREATE INDEX IF NOT EXISTS idx_agent_calls_ts ON agent_calls (ts);
+
+CREATE TABLE IF NOT EXISTS agent_spans (
+    workflow_id INTEGER,
+    ts REAL,
+    agent TEXT,
+    wall_ms REAL,
+    llm_ms REAL,
+    embedding_ms REAL,
+    search_ms REAL,
+    ttft_ms REAL,
+    llm_calls INTEGER,
+    input_tokens INTEGER,
+    output_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_agent_spans_agent ON agent_spans (agent, ts);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    granularity TEXT,
+    bucket INTEGER,
+    requests INTEGER,
+    successes INTEGER,
+    duration_sum REAL,
+    with_citations INTEGER,
+    PRIMARY KEY (granularity, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS agent_rollups (
+    granularity TEXT,
+    bucket INTEGER,
+    agent TEXT,
+    calls INTEGER,
+    PRIMARY KEY (granularity, bucket, agent)
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _to_ts(timestamp: str) -> float:
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return datetime.now().timestamp()
+
+
+class LogStore:
+    
+    def __init__(self, path: str = "logs/workflows.db"):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None and not self.path.exists():
+            self._conn.close()
+            self._conn = None
+        
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+        return self._conn
+    
+    def add(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._insert(conn, record)
+    
+    def import_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        count = 0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for record in records:
+                    self._insert(conn, record)
+                    count += 1
+        return count
+    
+    def backfill(self, records: Iterable[Dict[str, Any]]) -> int:
+        count = 0
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("SELECT 1 FROM meta WHERE key = 'backfilled'").fetchone() is None:
+                    if conn.execute("SELECT 1 FROM workflows LIMIT 1").fetchone() is None:
+                        for record in records:
+                            self._insert(conn, record)
+                            count += 1
+                    conn.execute("INSERT INTO meta (key, value) VALUES ('backfilled', '1')")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        return count
+    
+    def _insert(self, conn: sqlite3.Connection, record: Dict[str, Any]) -> None:
+        ts = _to_ts(record.get('timestamp'))
+        duration = record.get('duration', 0) or 0
+        success = 1 if record.get('status') == 'success' else 0
+        with_citations = 1 if record.get('citations_count', 0) > 0 else 0
+        
+        cursor = conn.execute(
+            "INSERT INTO workflows (timestamp, ts, duration, status, task, citations_count, output_length, record) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (record.get('timestamp'), ts, duration, record.get('status'), record.get('task', ''),
+             record.get('citations_count', 0), record.get('output_length', 0), json.dumps(record))
+        )
+        workflow_id = cursor.lastrowid
+        
+        agent_counts = {}
+        for trace in record.get('agent_trace', []):
+            agent = trace.get('agent', 'unknown')
+            conn.execute(
+                "INSERT INTO agent_calls (workflow_id, ts, agent, action) VALUES (?, ?, ?, ?)",
+                (workflow_id, ts, agent, trace.get('action', 'unknown'))
+            )
+            agent_counts[agent] = agent_counts.get(agent, 0) + 1
+        
+        for span in record.get('agent_metrics', []):
+            conn.execute(
+                "INSERT INTO agent_spans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (workflow_id, ts, span.get('agent', 'unknown'), span.get('wall_ms', 0), span.get('llm_ms', 0),
+                 span.get('embedding_ms', 0), span.get('search_ms', 0), span.get('ttft_ms'),
+                 span.get('llm_calls', 0), span.get('input_tokens', 0), span.get('output_tokens', 0))
+            )
+        
+        for granularity, seconds in GRANULARITIES.items():
+            bucket = int(ts // seconds) * seconds
+            conn.execute(
+                "INSERT INTO rollups VALUES (?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT (granularity, bucket) DO UPDATE SET "
+                "requests = requests + 1, successes = successes + excluded.successes, "
+                "duration_sum = duration_sum + excluded.duration_sum, "
+                "with_citations = with_citations + excluded.with_citations",
+                (granularity, bucket, success, duration, with_citations)
+            )
+            for agent, calls in agent_counts.items():
+                conn.execute(
+                    "INSERT INTO agent_rollups VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (granularity, bucket, agent) DO UPDATE SET calls = calls + excluded.calls",
+                    (granularity, bucket, agent, calls)
+                )
+    
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM workflows").fetchone()[0]
+    
+    @staticmethod
+    def granularity_for(since: Optional[float]) -> str:
+        if since is not None and datetime.now().timestamp() - since <= 6 * 3600:
+            return 'minute'
+        return 'hour'
+    
+    def summary(self, since: Optional[float] = None) -> Dict[str, Any]:
+        granularity = self.granularity_for(since)
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT COALESCE(SUM(requests), 0) AS requests, COALESCE(SUM(successes), 0) AS successes, "
+                "COALESCE(SUM(duration_sum), 0) AS duration_sum, COALESCE(SUM(with_citations), 0) AS with_citations "
+                "FROM rollups WHERE granularity = ? AND bucket >= ?",
+                (granularity, self._bucket_start(since, granularity))
+            ).fetchone()
+        return dict(row)
+    
+    def timeline(self, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        granularity = self.granularity_for(since)
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT bucket, requests, successes, duration_sum FROM rollups "
+                "WHERE granularity = ? AND bucket >= ? ORDER BY bucket",
+                (granularity, self._bucket_start(since, granularity))
+            ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def agent_calls(self, since: Optional[float] = None) -> Dict[str, int]:
+        granularity = self.granularity_for(since)
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT agent, SUM(calls) AS calls FROM agent_rollups "
+                "WHERE granularity = ? AND bucket >= ? GROUP BY agent ORDER BY agent",
+                (granularity, self._bucket_start(since, granularity))
+            ).fetchall()
+        return {row['agent']: row['calls'] for row in rows}
+    
+    def agent_actions(self, since: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT agent, action, COUNT(*) AS count FROM agent_calls "
+                "WHERE ts >= ? GROUP BY agent, action ORDER BY agent",
+                (since or 0,)
+            ).fetchall()
+        actions = {}
+        for row in rows:
+            actions.setdefault(row['agent'], {})[row['action']] = row['count']
+        return actions
+    
+    def agent_latency(self, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT agent, COUNT(*) AS spans, AVG(wall_ms) AS wall_ms, AVG(llm_ms) AS llm_ms, "
+                "AVG(embedding_ms) AS embedding_ms, AVG(search_ms) AS search_ms, AVG(ttft_ms) AS ttft_ms, "
+                "SUM(llm_calls) AS llm_calls, SUM(input_tokens) AS input_tokens, SUM(output_tokens) AS output_tokens "
+                "FROM agent_spans WHERE ts >= ? GROUP BY agent ORDER BY AVG(wall_ms) DESC",
+                (since or 0,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def query_workflows(self, since: Optional[float] = None, status: Optional[str] = None,
+                        limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT record FROM workflows WHERE ts >= ?"
+        params = [since or 0]
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+        sql += " ORDER BY ts"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return [json.loads(row['record']) for row in rows]
+    
+    @staticmethod
+    def _bucket_start(since: Optional[float], granularity: str) -> int:
+        if since is None:
+            return 0
+        seconds = GRANULARITIES[granularity]
+        return int(since // seconds) * seconds
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
\ No newline at end of file
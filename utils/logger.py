@@ -1,15 +1,37 @@
+import os
 import json
+import gzip
+import shutil
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional
+from .log_store import LogStore
+from observability.tracing import current_span
+
+LOG_FILE_NAME = "workflows.jsonl"
+STORE_FILE_NAME = "workflows.db"
+MAX_BYTES = 10 * 1024 * 1024
+ROTATE_INTERVAL = 24 * 60 * 60
+
 
 class WorkflowLogger:
-    def __init__(self, log_dir: str = "logs"):
+    def __init__(self, log_dir: str = "logs", max_bytes: int = MAX_BYTES,
+                 rotate_interval: Optional[float] = ROTATE_INTERVAL, compress: bool = True):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
+        self.log_file = self.log_dir / LOG_FILE_NAME
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._stream = None
+        self._opened_at = None
+        self.store = open_log_store(self.log_dir)
     
     def log_workflow(self, state: Dict[str, Any], duration: float, status: str):
         timestamp = datetime.now().isoformat()
+        span = current_span()
         log_entry = {
             'timestamp': timestamp,
             'duration': duration,
@@ -18,19 +40,142 @@ class WorkflowLogger:
             'agent_trace': state.get('agent_trace', []),
             'citations_count': len(state.get('citations', [])),
             'output_length': len(state.get('final_output', '')),
-            'verification': state.get('verification_result', {})
+            'verification': state.get('verification_result', {}),
+            'agent_metrics': state.get('agent_metrics', []),
+            'trace_id': span.trace_id if span else None
         }
         
-        log_file = self.log_dir / f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(log_file, 'w') as f:
-            json.dump(log_entry, f, indent=2)
+        line = json.dumps(log_entry) + "\n"
+        
+        rotated = None
+        with self._lock:
+            if self._stream is not None and not self.log_file.exists():
+                self._stream.close()
+                self._stream = None
+            if self._should_rotate(len(line.encode('utf-8'))):
+                rotated = self._rotate()
+            self._open().write(line)
+        
+        if rotated is not None and self.compress:
+            threading.Thread(target=compress_segment, args=(rotated,), name="log-compress").start()
+        
+        self.store.add(log_entry)
+        
+        return self.log_file
+    
+    def _open(self):
+        if self._stream is None:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            self._opened_at = self._segment_started_at()
+            self._stream = open(self.log_file, 'a', buffering=1, encoding='utf-8')
+        return self._stream
+    
+    def _segment_started_at(self) -> float:
+        try:
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                return datetime.fromisoformat(json.loads(f.readline())['timestamp']).timestamp()
+        except (OSError, ValueError, KeyError):
+            return datetime.now().timestamp()
+    
+    def _should_rotate(self, incoming: int) -> bool:
+        if not self.log_file.exists():
+            return False
+        
+        size = self.log_file.stat().st_size
+        if size == 0:
+            return False
+        
+        if self.max_bytes and size + incoming > self.max_bytes:
+            return True
+        
+        self._open()
+        return bool(self.rotate_interval) and datetime.now().timestamp() - self._opened_at >= self.rotate_interval
+    
+    def _rotate(self) -> Path:
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
         
-        return log_file
+        segment = self.log_dir / f"workflows_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jsonl"
+        os.replace(self.log_file, segment)
+        return segment
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+    
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        return iter_log_records(self.log_dir)
+
+
+def compress_segment(segment: Path) -> None:
+    partial = segment.with_name(f".{segment.name}.gz.partial")
+    try:
+        with open(segment, 'rb') as src, gzip.open(partial, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(partial, segment.with_name(f"{segment.name}.gz"))
+        segment.unlink()
+    except OSError as e:
+        print(f"Warning: could not compress {segment}: {e}")
+        partial.unlink(missing_ok=True)
+
+
+def _open_segment(path: Path):
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_log_records(log_dir: str = "logs") -> Iterator[Dict[str, Any]]:
+    log_dir = Path(log_dir)
+    if not log_dir.exists():
+        return
+    
+    for legacy_file in sorted(log_dir.glob('workflow_*.json')):
+        try:
+            with open(legacy_file, 'r') as f:
+                yield json.load(f)
+        except (OSError, ValueError):
+            continue
+    
+    segments = [
+        segment for segment in sorted(log_dir.glob('workflows_*.jsonl*'))
+        if segment.suffix == '.gz' or not segment.with_name(f"{segment.name}.gz").exists()
+    ]
+    if (log_dir / LOG_FILE_NAME).exists():
+        segments.append(log_dir / LOG_FILE_NAME)
+    
+    for segment in segments:
+        try:
+            with _open_segment(segment) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except OSError:
+            continue
+
+def open_log_store(log_dir: str = "logs") -> LogStore:
+    log_dir = Path(log_dir)
+    store = LogStore(log_dir / STORE_FILE_NAME)
+    imported = store.backfill(iter_log_records(log_dir))
+    if imported:
+        print(f"Imported {imported} workflow records into {store.path}")
+    return store
 
 _logger = None
+_logger_lock = threading.Lock()
 
 def get_logger() -> WorkflowLogger:
     global _logger
     if _logger is None:
-        _logger = WorkflowLogger()
+        with _logger_lock:
+            if _logger is None:
+                _logger = WorkflowLogger()
     return _logger
\ No newline at end of file
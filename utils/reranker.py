@@ -0,0 +1,111 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from .instrumentation import timed
+from observability.tracing import get_tracer
+
+
+RERANK_MODEL_NAME = 'cross-encoder/ms-marco-MiniLM-L-6-v2'
+RERANK_CANDIDATES = 20
+RERANK_BATCH_SIZE = 32
+SCORE_CACHE_SIZE = 4096
+
+
+class CrossEncoderReranker:
+    
+    def __init__(self, model_name: str = RERANK_MODEL_NAME, candidates: int = RERANK_CANDIDATES,
+                 batch_size: int = RERANK_BATCH_SIZE, cache_size: int = SCORE_CACHE_SIZE):
+        self.model_name = model_name
+        self.candidates = candidates
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._scores: "OrderedDict[Tuple[str, str, int, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def load(self) -> None:
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+                    
+                    print(f"Loading rerank model {self.model_name}...")
+                    self._model = CrossEncoder(self.model_name, device='cpu')
+    
+    @property
+    def model(self):
+        self.load()
+        return self._model
+    
+    @staticmethod
+    def _cache_key(query: str, doc: Dict) -> Tuple[str, str, int, str]:
+        text_hash = hashlib.sha256(doc['text'].encode('utf-8')).hexdigest()[:16]
+        return (' '.join(query.lower().split()), doc['source'], doc['chunk_id'], text_hash)
+    
+    def rerank(self, query: str, documents: List[Dict], top_k: int = 5) -> List[Dict]:
+        return self.rerank_many([query], [documents], top_k=top_k)[0]
+    
+    def rerank_many(self, queries: List[str], documents: List[List[Dict]], top_k: int = 5) -> List[List[Dict]]:
+        keys = [[self._cache_key(query, doc) for doc in docs] for query, docs in zip(queries, documents)]
+        
+        scores: Dict[Tuple[str, str, int, str], float] = {}
+        missing: Dict[Tuple[str, str, int, str], Tuple[str, str]] = {}
+        with self._lock:
+            for query, docs, doc_keys in zip(queries, documents, keys):
+                for doc, key in zip(docs, doc_keys):
+                    if key in scores or key in missing:
+                        continue
+                    score = self._scores.get(key)
+                    if score is None:
+                        self.misses += 1
+                        missing[key] = (query, doc['text'])
+                    else:
+                        self.hits += 1
+                        self._scores.move_to_end(key)
+                        scores[key] = score
+        
+        if missing:
+            with get_tracer().start_span("retriever.rerank", {'rerank.model': self.model_name, 'rerank.pairs': len(missing)}):
+                with timed('search_ms'):
+                    predicted = self.model.predict(list(missing.values()), batch_size=self.batch_size)
+            
+            computed = dict(zip(missing.keys(), (float(score) for score in predicted)))
+            scores.update(computed)
+            self._store(computed)
+        
+        reranked = []
+        for docs, doc_keys in zip(documents, keys):
+            ranked = sorted(zip(docs, doc_keys), key=lambda item: scores[item[1]], reverse=True)[:top_k]
+            reranked.append([{**doc, 'rerank_score': scores[key]} for doc, key in ranked])
+        return reranked
+    
+    def _store(self, computed: Dict[Tuple[str, str, int, str], float]) -> None:
+        if self.cache_size <= 0:
+            return
+        
+        with self._lock:
+            for key, score in computed.items():
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.cache_size:
+                self._scores.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._scores.clear()
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'model': self.model_name,
+                'candidates': self.candidates,
+                'cached_scores': len(self._scores),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
\ No newline at end of file
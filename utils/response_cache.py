@@ -0,0 +1,192 @@
+import os
+import re
+import copy
+import json
+import math
+import time
+import atexit
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+
+SIMILARITY_THRESHOLD = 0.98
+NUMBER_WORDS = {
+    'zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
+    'eleven', 'twelve', 'twenty', 'fifty', 'hundred', 'thousand', 'million', 'billion',
+    'first', 'second', 'third', 'fourth', 'fifth', 'last', 'next', 'previous'
+}
+KEY_TERM_PATTERN = re.compile(r"[$€£]?\w*\d[\w.,%/-]*|[A-Z][\w&.-]*|\w+")
+TTL_SECONDS = 24 * 60 * 60
+MAX_ENTRIES = 256
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm == 0:
+        return list(vector)
+    return [value / norm for value in vector]
+
+
+def _normalize_text(text: str) -> str:
+    return ' '.join(text.lower().split()).rstrip('.?!')
+
+
+def key_terms(text: str) -> List[str]:
+    terms = set()
+    for idx, token in enumerate(KEY_TERM_PATTERN.findall(text)):
+        lowered = token.lower().rstrip('.,')
+        if any(char.isdigit() for char in token) or lowered in NUMBER_WORDS:
+            terms.add(lowered)
+        elif token[0].isupper() and idx > 0:
+            terms.add(lowered)
+    return sorted(terms)
+
+
+class ResponseCache:
+    
+    def __init__(self, similarity_threshold: float = SIMILARITY_THRESHOLD, ttl_seconds: float = TTL_SECONDS,
+                 max_entries: int = MAX_ENTRIES, persist_path: Optional[str] = None):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.persist_path = Path(persist_path) if persist_path else None
+        self._entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        
+        if self.persist_path:
+            self._load()
+            atexit.register(self.save)
+    
+    def lookup(self, embedding: List[float], mode: str, fingerprint: str, task: str) -> Optional[Dict]:
+        query = _normalize(embedding)
+        normalized_task = _normalize_text(task)
+        terms = key_terms(task)
+        
+        with self._lock:
+            self._purge(fingerprint)
+            
+            best_entry = None
+            best_score = -1.0
+            for entry in self._entries:
+                if entry['mode'] != mode:
+                    continue
+                if _normalize_text(entry['task']) == normalized_task:
+                    best_entry, best_score = entry, 1.0
+                    break
+                if entry.get('key_terms', key_terms(entry['task'])) != terms:
+                    continue
+                score = sum(a * b for a, b in zip(query, entry['embedding']))
+                if score > best_score:
+                    best_entry, best_score = entry, score
+            
+            if best_entry is None or best_score < self.similarity_threshold:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            best_entry['last_access'] = time.time()
+            state = copy.deepcopy(best_entry['state'])
+        
+        state['task'] = task
+        return state
+    
+    def store(self, embedding: List[float], mode: str, fingerprint: str, task: str, state: Dict) -> None:
+        if self.max_entries <= 0:
+            return
+        
+        now = time.time()
+        entry = {
+            'embedding': _normalize(embedding),
+            'mode': mode,
+            'fingerprint': fingerprint,
+            'task': task,
+            'key_terms': key_terms(task),
+            'state': copy.deepcopy(dict(state)),
+            'created_at': now,
+            'last_access': now
+        }
+        
+        with self._lock:
+            self._purge(fingerprint)
+            self._entries = [e for e in self._entries if not (e['mode'] == mode and e['task'] == task)]
+            self._entries.append(entry)
+            
+            while len(self._entries) > self.max_entries:
+                oldest = min(self._entries, key=lambda e: e['last_access'])
+                self._entries.remove(oldest)
+                self.evictions += 1
+    
+    def invalidate(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries = []
+    
+    def _purge(self, fingerprint: str) -> None:
+        now = time.time()
+        kept = []
+        for entry in self._entries:
+            if entry['fingerprint'] != fingerprint:
+                self.invalidations += 1
+            elif now - entry['created_at'] > self.ttl_seconds:
+                self.evictions += 1
+            else:
+                kept.append(entry)
+        self._entries = kept
+    
+    def save(self) -> None:
+        if not self.persist_path:
+            return
+        
+        with self._lock:
+            entries = list(self._entries)
+        
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.persist_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'entries': entries}, f)
+        os.replace(tmp_path, self.persist_path)
+    
+    def _load(self) -> None:
+        if not self.persist_path.exists():
+            return
+        
+        try:
+            with open(self.persist_path, 'r') as f:
+                self._entries = json.load(f)['entries']
+        except (OSError, ValueError, KeyError):
+            self._entries = []
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(
+                    similarity_threshold=float(os.getenv("RESPONSE_CACHE_THRESHOLD", SIMILARITY_THRESHOLD)),
+                    ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL", TTL_SECONDS)),
+                    max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", MAX_ENTRIES)),
+                    persist_path=os.getenv("RESPONSE_CACHE_PATH") or None
+                )
+    return _response_cache
\ No newline at end of file
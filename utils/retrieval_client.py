@@ -0,0 +1,111 @@
+import json
+import queue
+import http.client
+from urllib.parse import urlsplit
+from typing import Dict, List, Optional
+from .instrumentation import timed
+from observability.tracing import get_tracer
+
+
+POOL_SIZE = 8
+REQUEST_TIMEOUT = 30.0
+
+
+class RemoteRetriever:
+    
+    def __init__(self, url: str, pool_size: int = POOL_SIZE, timeout: float = REQUEST_TIMEOUT):
+        parsed = urlsplit(url)
+        if parsed.scheme != 'http' or not parsed.hostname:
+            raise ValueError(f"Retriever URL must look like http://host:port, got '{url}'")
+        
+        self.url = url
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.timeout = timeout
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+        
+        info = self._request('GET', '/info')
+        self.search_mode = info['search_mode']
+        self.reranker = info['reranker']
+        self.embedding_model = info['embedding_model']
+    
+    def _acquire(self) -> http.client.HTTPConnection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+    
+    def _release(self, connection: http.client.HTTPConnection) -> None:
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+    
+    def _request(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        
+        for attempt in range(2):
+            connection = self._acquire()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                if attempt:
+                    raise ConnectionError(f"Retrieval server at {self.url} is unreachable: {e}") from e
+                continue
+            
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+            
+            result = json.loads(data) if data else {}
+            if response.status != 200:
+                raise RuntimeError(f"Retrieval server error {response.status}: {result.get('error', data[:200])}")
+            return result
+    
+    def search(self, query: str, top_k: int = 5) -> List[Dict]:
+        return self.search_many([query], top_k=top_k)[0]
+    
+    def search_many(self, queries: List[str], top_k: int = 5) -> List[List[Dict]]:
+        if not queries:
+            return []
+        
+        attributes = {
+            'retriever.queries': len(queries),
+            'retriever.top_k': top_k,
+            'retriever.remote': self.url
+        }
+        with get_tracer().start_span("retriever.search", attributes) as span:
+            with timed('search_ms'):
+                all_documents = self._request('POST', '/search', {'queries': queries, 'top_k': top_k})['results']
+            if span is not None:
+                span.set_attribute('retriever.results', sum(len(documents) for documents in all_documents))
+        
+        return all_documents
+    
+    def embed_query(self, query: str) -> List[float]:
+        return self.embed_queries([query])[0]
+    
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        with timed('embedding_ms'):
+            return self._request('POST', '/embed', {'texts': queries})['embeddings']
+    
+    def corpus_fingerprint(self) -> str:
+        return self._request('GET', '/info')['corpus_fingerprint']
+    
+    def warm_up(self) -> None:
+        self._request('GET', '/health')
+    
+    def get_stats(self) -> Dict:
+        return {**self._request('GET', '/stats'), 'remote': self.url}
+    
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
\ No newline at end of file
@@ -0,0 +1,168 @@
+import json
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from .batching import MicroBatcher, MAX_BATCH_SIZE, MAX_WAIT_MS
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_REQUEST_BYTES = 1 << 20
+
+
+class RetrievalServer:
+    
+    def __init__(self, retriever, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS):
+        self.retriever = retriever
+        self.retriever.enable_search_batching(max_batch_size, max_wait_ms)
+        self.embed_batcher = MicroBatcher(self._embed_batch, max_batch_size, max_wait_ms, name="server-embed-batcher")
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def _embed_batch(self, requests: List[List[str]]) -> List[List[List[float]]]:
+        texts = [text for texts in requests for text in texts]
+        embeddings = self.retriever.embed_queries(texts)
+        
+        results = []
+        offset = 0
+        for texts in requests:
+            results.append(embeddings[offset:offset + len(texts)])
+            offset += len(texts)
+        return results
+    
+    def info(self) -> Dict:
+        return {
+            'search_mode': self.retriever.search_mode,
+            'reranker': self.retriever.reranker.get_stats() if self.retriever.reranker else None,
+            'embedding_model': self.retriever.embedder.model_id,
+            'corpus_fingerprint': self.retriever.corpus_fingerprint()
+        }
+    
+    def stats(self) -> Dict:
+        return {
+            **self.retriever.get_stats(),
+            'embed_batcher': self.embed_batcher.get_stats()
+        }
+    
+    def _make_handler(self):
+        server = self
+        
+        class Handler(_RequestHandler):
+            retrieval_server = server
+        
+        return Handler
+    
+    def serve_forever(self) -> None:
+        self.httpd.serve_forever()
+    
+    def start(self) -> threading.Thread:
+        self._thread = threading.Thread(target=self.serve_forever, name="retrieval-server", daemon=True)
+        self._thread.start()
+        return self._thread
+    
+    def shutdown(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.embed_batcher.close()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    
+    protocol_version = "HTTP/1.1"
+    retrieval_server: RetrievalServer = None
+    
+    def do_GET(self) -> None:
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/info':
+            self._handle(self.retrieval_server.info)
+        elif self.path == '/stats':
+            self._handle(self.retrieval_server.stats)
+        else:
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+    
+    def do_POST(self) -> None:
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length > MAX_REQUEST_BYTES:
+                self._send_json(413, {'error': "Request too large"})
+                return
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError as e:
+            self._send_json(400, {'error': f"Invalid JSON: {e}"})
+            return
+        
+        if self.path == '/search':
+            queries = payload.get('queries')
+            if not isinstance(queries, list) or not all(isinstance(query, str) for query in queries):
+                self._send_json(400, {'error': "'queries' must be a list of strings"})
+                return
+            top_k = payload.get('top_k', 5)
+            if not isinstance(top_k, int) or top_k < 1:
+                self._send_json(400, {'error': "'top_k' must be a positive integer"})
+                return
+            self._handle(lambda: {'results': self.retrieval_server.retriever.search_many(queries, top_k=top_k)})
+        elif self.path == '/embed':
+            texts = payload.get('texts')
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                self._send_json(400, {'error': "'texts' must be a list of strings"})
+                return
+            self._handle(lambda: {'embeddings': self.retrieval_server.embed_batcher.call(texts) if texts else []})
+        else:
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+    
+    def _handle(self, func) -> None:
+        try:
+            payload = func()
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+        self._send_json(200, payload)
+    
+    def _send_json(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def main(argv=None) -> None:
+    from dotenv import load_dotenv
+    from .retriever import create_local_retriever
+    
+    parser = argparse.ArgumentParser(description="Serve one shared retriever (embedding model + index) over localhost HTTP")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE, help="Most requests merged into one search")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS, help="How long to wait for more requests to batch")
+    args = parser.parse_args(argv)
+    
+    load_dotenv()
+    retriever = create_local_retriever()
+    retriever.warm_up()
+    
+    server = RetrievalServer(retriever, args.host, args.port, args.max_batch_size, args.max_wait_ms)
+    print(f"Retrieval server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,122 +1,450 @@
 import os
-from typing import List, Dict
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
+import json
+import atexit
+import hashlib
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
+from .instrumentation import timed
+from .bm25 import BM25Index, reciprocal_rank_fusion
+from .reranker import CrossEncoderReranker
+from .chunker import MarkdownChunker, CHUNK_TOKENS, OVERLAP_TOKENS
+from .embeddings import create_embedding_backend, EMBEDDING_MODEL_NAME
+from .ingestion import IngestionPipeline, INGEST_WORKERS, hash_text
+from .batching import MicroBatcher, MAX_BATCH_SIZE
+from observability.tracing import get_tracer
+
+
+EMBED_BATCH_SIZE = 64
+INDEX_SCHEMA_VERSION = 2
+QUERY_CACHE_SIZE = 1024
+SEARCH_MODES = ('dense', 'bm25', 'hybrid')
+HYBRID_CANDIDATES = 20
+RRF_K = 60
+BATCH_WAIT_MS = 2.0
+
+
+class QueryEmbeddingCache:
+    
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE, persist_path: Optional[str] = None):
+        self.max_size = max_size
+        self.persist_path = Path(persist_path) if persist_path else None
+        self._entries: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+        if self.persist_path:
+            self._load()
+            atexit.register(self.save)
+    
+    @staticmethod
+    def make_key(query: str, model_id: str) -> Tuple[str, str]:
+        return (model_id, ' '.join(query.lower().split()))
+    
+    def get(self, key: Tuple[str, str]) -> Optional[List[float]]:
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+    
+    def put(self, key: Tuple[str, str], embedding: List[float]) -> None:
+        if self.max_size <= 0:
+            return
+        
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def save(self) -> None:
+        if not self.persist_path:
+            return
+        
+        with self._lock:
+            entries = [[model_id, query, embedding] for (model_id, query), embedding in self._entries.items()]
+        
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.persist_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'entries': entries}, f)
+        os.replace(tmp_path, self.persist_path)
+    
+    def _load(self) -> None:
+        if not self.persist_path.exists():
+            return
+        
+        try:
+            with open(self.persist_path, 'r') as f:
+                entries = json.load(f)['entries']
+        except (OSError, ValueError, KeyError):
+            return
+        
+        for model_id, query, embedding in entries[-self.max_size:] if self.max_size > 0 else []:
+            self._entries[(model_id, query)] = embedding
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'persistent': self.persist_path is not None
+            }
 
 
 class DocumentRetriever:
     
-    def __init__(self, data_dir: str = "data", collection_name: str = "documents"):
+    def __init__(self, data_dir: str = "data", collection_name: str = "documents",
+                 persist_directory: Optional[str] = "./chroma_db",
+                 query_cache_size: int = QUERY_CACHE_SIZE,
+                 query_cache_path: Optional[str] = None,
+                 search_mode: str = "dense",
+                 rerank: bool = False,
+                 chunk_tokens: int = CHUNK_TOKENS,
+                 chunk_overlap: int = OVERLAP_TOKENS,
+                 embed_batch_size: int = EMBED_BATCH_SIZE,
+                 ingest_workers: int = INGEST_WORKERS,
+                 embedding_backend: str = "sentence-transformers",
+                 embedding_model: str = EMBEDDING_MODEL_NAME,
+                 batch_wait_ms: Optional[float] = None,
+                 max_batch_size: int = MAX_BATCH_SIZE):
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{search_mode}'. Expected one of: {', '.join(SEARCH_MODES)}")
+        
         self.data_dir = Path(data_dir)
         self.collection_name = collection_name
+        self.embed_batch_size = embed_batch_size
+        self.ingest_workers = ingest_workers
+        self.persist_directory = Path(persist_directory) if persist_directory else None
+        self.manifest_path = (
+            self.persist_directory / f"{collection_name}_manifest.json"
+            if self.persist_directory else None
+        )
+        self._manifest = {'files': {}}
+        self.search_mode = search_mode
+        self.keyword_index = BM25Index()
+        self.keyword_index_path = (
+            self.persist_directory / f"{collection_name}_bm25.json"
+            if self.persist_directory else None
+        )
+        self._search_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hybrid-search")
+        self.reranker = CrossEncoderReranker() if rerank else None
+        self.search_batcher: Optional[MicroBatcher] = None
+        if batch_wait_ms is not None:
+            self.enable_search_batching(max_batch_size, batch_wait_ms)
+        self.query_cache = QueryEmbeddingCache(max_size=query_cache_size, persist_path=query_cache_path)
         
-        print("Loading embedding model...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedder = create_embedding_backend(embedding_backend, embedding_model)
+        self.chunker = self._create_chunker(chunk_tokens, chunk_overlap)
         
-        self.client = chromadb.Client(Settings(
-            persist_directory="./chroma_db",
-            anonymized_telemetry=False
-        ))
+        import chromadb
+        from chromadb.config import Settings
+        
+        if self.persist_directory:
+            self.client = chromadb.PersistentClient(
+                path=str(self.persist_directory),
+                settings=Settings(anonymized_telemetry=False)
+            )
+        else:
+            self.client = chromadb.EphemeralClient(Settings(anonymized_telemetry=False))
+        
+        self.collection = self._open_collection()
+    
+    def _create_chunker(self, chunk_tokens: int, chunk_overlap: int) -> MarkdownChunker:
+        max_seq_length = self.embedder.max_seq_length
+        if max_seq_length:
+            chunk_tokens = min(chunk_tokens, max_seq_length - 2)
+        
+        return MarkdownChunker(chunk_tokens, chunk_overlap, count_tokens=self.embedder.token_counter())
+    
+    def _index_schema(self) -> Dict:
+        return {
+            'schema_version': INDEX_SCHEMA_VERSION,
+            'embedding_model': self.embedder.model_id,
+            **self.chunker.config()
+        }
+    
+    def _open_collection(self):
+        schema = self._index_schema()
+        metadata = {"description": "Document collection for agentic assistant", **schema}
         
-        self.collection = self.client.get_or_create_collection(
+        collection = self.client.get_or_create_collection(
             name=self.collection_name,
-            metadata={"description": "Document collection for agentic assistant"}
+            metadata=metadata
         )
         
+        existing = collection.metadata or {}
+        if any(existing.get(key) != value for key, value in schema.items()):
+            previous = {key: existing.get(key) for key in schema}
+            print(f"Index schema changed ({previous} -> {schema}). Rebuilding index...")
+            self.client.delete_collection(self.collection_name)
+            for path in (self.manifest_path, self.keyword_index_path):
+                if path and path.exists():
+                    path.unlink()
+            collection = self.client.get_or_create_collection(
+                name=self.collection_name,
+                metadata=metadata
+            )
+        
+        return collection
+    
     def load_documents(self) -> None:
         print(f"Loading documents from {self.data_dir}...")
         
-        if self.collection.count() > 0:
-            print(f"Collection already has {self.collection.count()} documents. Skipping ingestion.")
-            return
+        manifest = self._load_manifest()
+        pipeline = IngestionPipeline(self, manifest, workers=self.ingest_workers, batch_size=self.embed_batch_size)
+        stats = pipeline.run(list(self._iter_source_files()))
         
-        documents = []
-        metadatas = []
-        ids = []
+        if stats['indexed_chunks']:
+            rate = stats['indexed_chunks'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+            print(f"✓ Successfully indexed {stats['indexed_chunks']} chunks from {len(stats['indexed_sources'])} documents "
+                  f"in {stats['seconds']:.1f}s ({rate:.1f} chunks/s)")
+        if stats['reused_chunks']:
+            print(f"✓ Reused stored embeddings for {stats['reused_chunks']} moved chunks")
+        if not stats['indexed_chunks'] and not stats['reused_chunks'] and not stats['deleted_chunks'] and not stats['updated_chunks']:
+            print(f"Collection already up to date ({self.collection.count()} chunks). Skipping ingestion.")
         
-        for file_path in self.data_dir.glob("**/*"):
-            if file_path.is_file() and file_path.suffix in ['.txt', '.md']:
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    chunks = self._chunk_document(content, file_path.name)
-                    
-                    for idx, chunk in enumerate(chunks):
-                        documents.append(chunk['text'])
-                        metadatas.append({
-                            'source': chunk['source'],
-                            'chunk_id': idx,
-                            'total_chunks': len(chunks)
-                        })
-                        ids.append(f"{file_path.stem}_{idx}")
-                    
-                    print(f"  ✓ Loaded {file_path.name} ({len(chunks)} chunks)")
-                
-                except Exception as e:
-                    print(f"  ✗ Error loading {file_path.name}: {e}")
-        
-        if documents:
-            print(f"Adding {len(documents)} document chunks to vector store...")
-            
-            embeddings = self.embedding_model.encode(documents).tolist()
-            
-            self.collection.add(
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadatas,
-                ids=ids
-            )
-            
-            print(f"✓ Successfully indexed {len(documents)} chunks from {len(set(m['source'] for m in metadatas))} documents")
-        else:
+        if not manifest['files']:
             print("⚠ No documents found to index")
+        
+        self._refresh_keyword_index(manifest)
+    
+    def _iter_source_files(self):
+        for file_path in sorted(self.data_dir.glob("**/*")):
+            if file_path.is_file() and file_path.suffix in ['.txt', '.md']:
+                yield file_path
     
-    def _chunk_document(self, content: str, source: str, chunk_size: int = 1000) -> List[Dict]:
-        paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
+    def _load_manifest(self) -> Dict:
+        manifest = self._manifest
+        
+        if self.manifest_path and self.manifest_path.exists():
+            try:
+                with open(self.manifest_path, 'r') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                manifest = {'files': {}}
         
-        chunks = []
-        current_chunk = ""
+        return self._reconcile_manifest(manifest)
+    
+    def _reconcile_manifest(self, manifest: Dict) -> Dict:
+        expected = sum(len(entry['chunks']) for entry in manifest['files'].values())
+        if expected == self.collection.count():
+            return manifest
         
-        for para in paragraphs:
-            if len(current_chunk) + len(para) > chunk_size and current_chunk:
-                chunks.append({
-                    'text': current_chunk.strip(),
-                    'source': source
-                })
-                current_chunk = para
+        present = set(self.collection.get(include=[])['ids'])
+        reindex = []
+        kept_ids = set()
+        for file_key, entry in list(manifest['files'].items()):
+            entry_ids = {f"{entry['stem']}_{idx}" for idx in range(len(entry['chunks']))}
+            if entry_ids <= present:
+                kept_ids.update(entry_ids)
             else:
-                current_chunk += "\n\n" + para if current_chunk else para
+                reindex.append(manifest['files'].pop(file_key))
         
-        if current_chunk:
-            chunks.append({
-                'text': current_chunk.strip(),
-                'source': source
-            })
+        orphans = list(present - kept_ids)
+        if orphans:
+            self.collection.delete(ids=orphans)
         
-        return chunks if chunks else [{'text': content, 'source': source}]
+        print(f"Reconciled index with vector store: {len(reindex)} files to re-index, {len(orphans)} partial chunks removed")
+        return manifest
+    
+    def _save_manifest(self, manifest: Dict) -> None:
+        self._manifest = manifest
+        if not self.manifest_path:
+            return
+        
+        self.persist_directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def _refresh_keyword_index(self, manifest: Dict) -> None:
+        chunk_hashes = {file_key: entry['chunks'] for file_key, entry in manifest['files'].items()}
+        signature = hash_text(json.dumps(chunk_hashes, sort_keys=True))
+        if self.keyword_index.signature == signature:
+            return
+        
+        if self.keyword_index_path and self.keyword_index_path.exists():
+            loaded = BM25Index.load(self.keyword_index_path)
+            if loaded is not None and loaded.signature == signature:
+                self.keyword_index = loaded
+                return
+        
+        data = self.collection.get(include=['documents', 'metadatas'])
+        self.keyword_index.build(data['ids'], data['documents'], data['metadatas'], signature=signature)
+        if self.keyword_index_path:
+            self.keyword_index.save(self.keyword_index_path)
+        print(f"✓ Built keyword index over {len(self.keyword_index)} chunks")
+    
+    def _chunk_document(self, content: str, source: str) -> List[Dict]:
+        return self.chunker.chunk(content, source)
     
     def search(self, query: str, top_k: int = 5) -> List[Dict]:
-        query_embedding = self.embedding_model.encode(query).tolist()
+        return self.search_many([query], top_k=top_k)[0]
+    
+    def search_many(self, queries: List[str], top_k: int = 5) -> List[List[Dict]]:
+        if not queries:
+            return []
+        
+        attributes = {
+            'retriever.queries': len(queries),
+            'retriever.top_k': top_k,
+            'retriever.mode': self.search_mode,
+            'retriever.rerank': self.reranker is not None
+        }
+        with get_tracer().start_span("retriever.search", attributes) as span:
+            if self.search_batcher is not None:
+                all_documents = self.search_batcher.call((queries, top_k))
+            else:
+                all_documents = self._search(queries, top_k)
+            if span is not None:
+                span.set_attribute('retriever.results', sum(len(documents) for documents in all_documents))
         
+        return all_documents
+    
+    def enable_search_batching(self, max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = BATCH_WAIT_MS) -> None:
+        previous = self.search_batcher
+        self.search_batcher = MicroBatcher(self._search_batch, max_batch_size, max_wait_ms, name="search-batcher")
+        if previous is not None:
+            previous.close()
+    
+    def disable_search_batching(self) -> None:
+        previous, self.search_batcher = self.search_batcher, None
+        if previous is not None:
+            previous.close()
+    
+    def _search_batch(self, requests: List[Tuple[List[str], int]]) -> List[List[List[Dict]]]:
+        by_top_k: Dict[int, List[int]] = {}
+        for idx, (_, top_k) in enumerate(requests):
+            by_top_k.setdefault(top_k, []).append(idx)
+        
+        results: List[List[List[Dict]]] = [[] for _ in requests]
+        for top_k, indices in by_top_k.items():
+            found = self._search([query for idx in indices for query in requests[idx][0]], top_k)
+            
+            offset = 0
+            for idx in indices:
+                count = len(requests[idx][0])
+                results[idx] = found[offset:offset + count]
+                offset += count
+        return results
+    
+    def _search(self, queries: List[str], top_k: int) -> List[List[Dict]]:
+        if self.reranker is not None:
+            candidates = self._retrieve(queries, max(top_k, self.reranker.candidates))
+            return self.reranker.rerank_many(queries, candidates, top_k=top_k)
+        return self._retrieve(queries, top_k)
+    
+    def _retrieve(self, queries: List[str], top_k: int) -> List[List[Dict]]:
+        if self.search_mode == 'dense':
+            return self._query_collection(queries, top_k)
+        if self.search_mode == 'bm25':
+            return [reciprocal_rank_fusion([documents], top_k, RRF_K) for documents in self._keyword_search(queries, top_k)]
+        return self._hybrid_search(queries, top_k)
+    
+    def _hybrid_search(self, queries: List[str], top_k: int) -> List[List[Dict]]:
+        candidates = max(top_k, HYBRID_CANDIDATES)
+        query_embeddings = self._encode_queries(queries)
+        
+        with timed('search_ms'):
+            dense_future = self._search_executor.submit(
+                contextvars.copy_context().run, self._query_embeddings, query_embeddings, candidates
+            )
+            keyword_results = self.keyword_index.search_many(queries, top_k=candidates)
+            dense_results = dense_future.result()
+        
+        return [
+            reciprocal_rank_fusion([dense, keyword], top_k, RRF_K)
+            for dense, keyword in zip(dense_results, keyword_results)
+        ]
+    
+    def _keyword_search(self, queries: List[str], top_k: int) -> List[List[Dict]]:
+        with timed('search_ms'):
+            return self.keyword_index.search_many(queries, top_k=top_k)
+    
+    def _query_collection(self, queries: List[str], top_k: int) -> List[List[Dict]]:
+        query_embeddings = self._encode_queries(queries)
+        
+        with timed('search_ms'):
+            return self._query_embeddings(query_embeddings, top_k)
+    
+    def _query_embeddings(self, query_embeddings: List[List[float]], top_k: int) -> List[List[Dict]]:
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings,
             n_results=top_k
         )
         
-        documents = []
-        if results['documents']:
-            for idx in range(len(results['documents'][0])):
-                documents.append({
-                    'text': results['documents'][0][idx],
-                    'source': results['metadatas'][0][idx]['source'],
-                    'chunk_id': results['metadatas'][0][idx]['chunk_id'],
-                    'distance': results['distances'][0][idx] if 'distances' in results else None
-                })
+        all_documents = []
+        for query_idx in range(len(query_embeddings)):
+            documents = []
+            if results['documents'] and query_idx < len(results['documents']):
+                distances = results.get('distances')
+                for idx in range(len(results['documents'][query_idx])):
+                    documents.append({
+                        'text': results['documents'][query_idx][idx],
+                        'source': results['metadatas'][query_idx][idx]['source'],
+                        'chunk_id': results['metadatas'][query_idx][idx]['chunk_id'],
+                        'distance': distances[query_idx][idx] if distances else None
+                    })
+            all_documents.append(documents)
+        
+        return all_documents
+    
+    def embed_query(self, query: str) -> List[float]:
+        return self.embed_queries([query])[0]
+    
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        return self._encode_queries(queries)
+    
+    def corpus_fingerprint(self) -> str:
+        digest = hashlib.sha256(json.dumps(self._index_schema(), sort_keys=True).encode('utf-8'))
+        for file_path in self._iter_source_files():
+            stat = file_path.stat()
+            file_key = file_path.relative_to(self.data_dir).as_posix()
+            digest.update(f"{file_key}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _encode_queries(self, queries: List[str]) -> List[List[float]]:
+        keys = [QueryEmbeddingCache.make_key(query, self.embedder.model_id) for query in queries]
+        embeddings = [self.query_cache.get(key) for key in keys]
+        
+        missing = {}
+        for idx, embedding in enumerate(embeddings):
+            if embedding is None:
+                missing.setdefault(keys[idx], queries[idx])
+        
+        if missing:
+            with timed('embedding_ms'):
+                encoded = self.embedder.encode(list(missing.values())).tolist()
+            computed = dict(zip(missing.keys(), encoded))
+            for key, embedding in computed.items():
+                self.query_cache.put(key, embedding)
+            embeddings = [embedding if embedding is not None else computed[key]
+                          for key, embedding in zip(keys, embeddings)]
         
-        return documents
+        return embeddings
+    
+    def warm_up(self) -> None:
+        self.embedder.encode(["warm up"])
+        if self.reranker is not None:
+            self.reranker.load()
     
     def get_stats(self) -> Dict:
         count = self.collection.count()
@@ -130,15 +458,53 @@ class DocumentRetriever:
         return {
             'total_chunks': count,
             'total_documents': len(sources),
-            'sources': list(sources)
+            'sources': list(sources),
+            'search_mode': self.search_mode,
+            'keyword_index_chunks': len(self.keyword_index),
+            'reranker': self.reranker.get_stats() if self.reranker else None,
+            'query_cache': self.query_cache.get_stats(),
+            'search_batcher': self.search_batcher.get_stats() if self.search_batcher else None
         }
 
 
 _retriever = None
+_retriever_lock = threading.Lock()
 
-def get_retriever() -> DocumentRetriever:
+def get_retriever():
     global _retriever
     if _retriever is None:
-        _retriever = DocumentRetriever()
-        _retriever.load_documents()
-    return _retriever
\ No newline at end of file
+        with _retriever_lock:
+            if _retriever is None:
+                url = os.getenv("RETRIEVER_URL")
+                if url:
+                    from .retrieval_client import RemoteRetriever, POOL_SIZE
+                    _retriever = RemoteRetriever(url, pool_size=int(os.getenv("RETRIEVER_POOL_SIZE", POOL_SIZE)))
+                else:
+                    _retriever = create_local_retriever()
+    return _retriever
+
+
+def _batch_wait_ms() -> Optional[float]:
+    value = os.getenv("RETRIEVER_BATCH_WAIT_MS", "off").strip().lower()
+    if value in ('', 'off', 'none', '-1'):
+        return None
+    return float(value)
+
+
+def create_local_retriever() -> DocumentRetriever:
+    retriever = DocumentRetriever(
+        query_cache_size=int(os.getenv("QUERY_CACHE_SIZE", QUERY_CACHE_SIZE)),
+        query_cache_path=os.getenv("QUERY_CACHE_PATH") or None,
+        search_mode=os.getenv("RETRIEVER_SEARCH_MODE", "dense"),
+        rerank=os.getenv("RETRIEVER_RERANK", "false").lower() in ('1', 'true', 'yes'),
+        chunk_tokens=int(os.getenv("CHUNK_TOKENS", CHUNK_TOKENS)),
+        chunk_overlap=int(os.getenv("CHUNK_OVERLAP_TOKENS", OVERLAP_TOKENS)),
+        embed_batch_size=int(os.getenv("EMBED_BATCH_SIZE", EMBED_BATCH_SIZE)),
+        ingest_workers=int(os.getenv("INGEST_WORKERS", INGEST_WORKERS)),
+        embedding_backend=os.getenv("EMBEDDING_BACKEND", "sentence-transformers"),
+        embedding_model=os.getenv("EMBEDDING_MODEL", EMBEDDING_MODEL_NAME),
+        batch_wait_ms=_batch_wait_ms(),
+        max_batch_size=int(os.getenv("RETRIEVER_MAX_BATCH_SIZE", MAX_BATCH_SIZE))
+    )
+    retriever.load_documents()
+    return retriever
\ No newline at end of file